@@ -44,10 +44,59 @@ const websiteSchema = new Schema(
       type: Number,
       default: null,
     },
+    // Negotiated HTTP version of the last health check (e.g. "HTTP/2")
+    protocol: {
+      type: String,
+      default: null,
+    },
     lastCheckedAt: {
       type: Date,
       default: null,
     },
+    // Down alert queued but not yet delivered (maintained by the Python workers)
+    alertPending: {
+      type: Boolean,
+      default: undefined,
+    },
+    // Optional content assertions checked against the streamed response body
+    assertions: {
+      required: { type: [String], default: undefined },
+      forbidden: { type: [String], default: undefined },
+      regex: { type: String, default: null },
+      maxBytes: { type: Number, default: null },
+    },
+    contentCheck: {
+      passed: { type: Boolean },
+      failures: { type: [String], default: undefined },
+      bytesRead: { type: Number },
+      complete: { type: Boolean },
+    },
+    // Per-host probe state: latency EWMA and circuit breaker (maintained by the Python workers)
+    probe: {
+      latencyEwma: { type: Number, default: undefined },
+      failures: { type: Number, default: undefined },
+      openUntil: { type: Date, default: undefined },
+    },
+    // Latency sketch and baselines (maintained by the Python workers)
+    latency: {
+      sketch: { type: Schema.Types.Mixed, default: undefined },
+      count: { type: Number, default: undefined },
+      ewma: { type: Number, default: undefined },
+      p50: { type: Number, default: undefined },
+      p95: { type: Number, default: undefined },
+      p99: { type: Number, default: undefined },
+      regression: { type: Boolean, default: false },
+      baselineUpdatedAt: { type: Date, default: null },
+    },
+    // Redirect chain followed by the last health check (maintained by the Python workers)
+    redirect: {
+      target: { type: String, default: null },
+      chain: { type: Schema.Types.Mixed, default: undefined },
+      hops: { type: Number, default: null },
+      hopMs: { type: Number, default: null },
+      permanent: { type: Boolean, default: false },
+      resolvedAt: { type: Date, default: null },
+    },
     // Persistent SSL data (rarely changes)
     ssl: {
       isValid: { type: Boolean, default: false },
@@ -68,6 +117,8 @@ const websiteSchema = new Schema(
       h2Count: { type: Number, default: null },
       imageCount: { type: Number, default: null },
       imagesWithoutAlt: { type: Number, default: null },
+      pageWeight: { type: Number, default: null },
+      assets: { type: Schema.Types.Mixed, default: undefined },
       issues: { type: [String], default: [] },
       hasIssues: { type: Boolean, default: false },
     },
@@ -24,6 +24,100 @@ HEALTH_CHECK_TIMEOUT = int(os.getenv('HEALTH_CHECK_TIMEOUT', 10))
 SEO_ANALYSIS_TIMEOUT = int(os.getenv('SEO_ANALYSIS_TIMEOUT', 15))
 SSL_CHECK_TIMEOUT = int(os.getenv('SSL_CHECK_TIMEOUT', 10))
 
+# Probe Resilience Configuration
+# Timeouts adapt to each host's recent latency (EWMA x multiplier), bounded by the
+# fixed timeouts above; dead hosts trip a circuit breaker with exponential cooldown.
+# Keep CIRCUIT_MAX_COOLDOWN below the interval between scheduled runs so every run
+# re-checks open circuits with a TCP connect
+PROBE_MIN_TIMEOUT = float(os.getenv('PROBE_MIN_TIMEOUT', 2))
+PROBE_TIMEOUT_MULTIPLIER = float(os.getenv('PROBE_TIMEOUT_MULTIPLIER', 4))
+PROBE_LATENCY_ALPHA = float(os.getenv('PROBE_LATENCY_ALPHA', 0.3))
+PROBE_MAX_RETRIES = int(os.getenv('PROBE_MAX_RETRIES', 2))
+PROBE_RETRY_BASE_DELAY = float(os.getenv('PROBE_RETRY_BASE_DELAY', 0.5))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 3))
+CIRCUIT_COOLDOWN = int(os.getenv('CIRCUIT_COOLDOWN', 15 * 60))
+CIRCUIT_MAX_COOLDOWN = int(os.getenv('CIRCUIT_MAX_COOLDOWN', 12 * 3600))
+
+# HTTP/2 Configuration
+# Origins with at least this many monitored URLs are probed over one multiplexed connection
+HTTP2_MIN_URLS_PER_ORIGIN = int(os.getenv('HTTP2_MIN_URLS_PER_ORIGIN', 2))
+# Concurrent streams one tenant may open on a multiplexed origin connection
+HTTP2_MAX_STREAMS = int(os.getenv('HTTP2_MAX_STREAMS', 6))
+
+# Redirect Cache Configuration
+# Permanent redirects (301/308) are probed at their final target and re-followed
+# from the original URL at least this often (seconds)
+REDIRECT_REVALIDATE_AFTER = int(os.getenv('REDIRECT_REVALIDATE_AFTER', 7 * 24 * 3600))
+
+# Warm Cache Configuration
+# Probe caches are snapshotted to MongoDB at the end of each run and reloaded at
+# startup; snapshot entries untouched for WARM_CACHE_MAX_AGE seconds are dropped.
+# DNS answers are reused for DNS_CACHE_TTL seconds (0 disables), long enough to
+# carry over between the staggered health/SSL/SEO runs; ETag/Last-Modified
+# validators let the SEO worker skip unchanged pages for up to VALIDATOR_MAX_AGE
+WARM_CACHE_MAX_AGE = int(os.getenv('WARM_CACHE_MAX_AGE', 30 * 24 * 3600))
+DNS_CACHE_TTL = int(os.getenv('DNS_CACHE_TTL', 900))
+VALIDATOR_MAX_AGE = int(os.getenv('VALIDATOR_MAX_AGE', 7 * 24 * 3600))
+
+# Content Assertion Configuration
+# Bodies are streamed in CONTENT_CHUNK_SIZE chunks and never scanned past
+# CONTENT_MAX_SCAN_BYTES; regex matches may span at most CONTENT_REGEX_WINDOW chars
+CONTENT_CHUNK_SIZE = int(os.getenv('CONTENT_CHUNK_SIZE', 16 * 1024))
+CONTENT_MAX_SCAN_BYTES = int(os.getenv('CONTENT_MAX_SCAN_BYTES', 5 * 1024 * 1024))
+CONTENT_REGEX_WINDOW = int(os.getenv('CONTENT_REGEX_WINDOW', 4096))
+
+# Asset Audit Configuration
+# The SEO worker checks up to ASSET_AUDIT_MAX_ASSETS images/scripts/stylesheets per
+# page with HEAD requests, ASSET_AUDIT_CONCURRENCY at a time
+ASSET_AUDIT_CONCURRENCY = int(os.getenv('ASSET_AUDIT_CONCURRENCY', 4))
+ASSET_AUDIT_MAX_ASSETS = int(os.getenv('ASSET_AUDIT_MAX_ASSETS', 50))
+ASSET_AUDIT_TIMEOUT = int(os.getenv('ASSET_AUDIT_TIMEOUT', 5))
+ASSET_SLOW_MS = int(os.getenv('ASSET_SLOW_MS', 1000))
+PAGE_WEIGHT_BUDGET = int(os.getenv('PAGE_WEIGHT_BUDGET', 3 * 1024 * 1024))
+
+# Latency Baseline Configuration
+# Each site keeps a log-bucketed quantile sketch (relative accuracy below) and an
+# EWMA; the baseline job decays sketches and flags EWMA regressions vs. the p50
+LATENCY_SKETCH_ACCURACY = float(os.getenv('LATENCY_SKETCH_ACCURACY', 0.05))
+LATENCY_EWMA_ALPHA = float(os.getenv('LATENCY_EWMA_ALPHA', 0.2))
+LATENCY_SKETCH_DECAY = float(os.getenv('LATENCY_SKETCH_DECAY', 0.95))
+LATENCY_MIN_SAMPLES = int(os.getenv('LATENCY_MIN_SAMPLES', 5))
+LATENCY_REGRESSION_FACTOR = float(os.getenv('LATENCY_REGRESSION_FACTOR', 1.5))
+LATENCY_REGRESSION_MIN_DELTA = int(os.getenv('LATENCY_REGRESSION_MIN_DELTA', 250))
+
+# Scheduling Configuration
+# Probes run on a shared pool; each tenant (user or visitor token) gets a share of
+# turns proportional to its tier weight, with at most TENANT_CONCURRENCY slots in
+# flight (same-origin probes multiplexed onto one connection share a slot)
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', 8))
+TENANT_CONCURRENCY = int(os.getenv('TENANT_CONCURRENCY', 2))
+TENANT_WEIGHT_REGISTERED = float(os.getenv('TENANT_WEIGHT_REGISTERED', 4))
+TENANT_WEIGHT_GUEST = float(os.getenv('TENANT_WEIGHT_GUEST', 2))
+TENANT_WEIGHT_UNOWNED = float(os.getenv('TENANT_WEIGHT_UNOWNED', 1))
+
+# Checkpoint Configuration
+# A non-zero WORKER_TIME_BUDGET (seconds) splits long runs into time-boxed slices,
+# each resuming the previous one. Paused or crashed runs are picked up by hourly
+# continuation invocations (WORKER_RESUME_ONLY=true), which exit unless there is
+# an unfinished run; runs with no progress saved for CHECKPOINT_MAX_AGE restart,
+# and a running run saved within CHECKPOINT_LEASE is assumed alive and left alone.
+# Finished and abandoned runs are deleted after CHECKPOINT_RETENTION seconds
+WORKER_TIME_BUDGET = int(os.getenv('WORKER_TIME_BUDGET', 0))
+WORKER_RESUME_ONLY = os.getenv('WORKER_RESUME_ONLY', 'false').lower() == 'true'
+CHECKPOINT_SAVE_EVERY = int(os.getenv('CHECKPOINT_SAVE_EVERY', 25))
+CHECKPOINT_MAX_AGE = int(os.getenv('CHECKPOINT_MAX_AGE', 12 * 3600))
+CHECKPOINT_LEASE = int(os.getenv('CHECKPOINT_LEASE', 15 * 60))
+CHECKPOINT_RETENTION = int(os.getenv('CHECKPOINT_RETENTION', 14 * 24 * 3600))
+
+# Alert Configuration
+# Down/recovery alerts are grouped per user and sent as one digest per window (seconds)
+ALERT_DIGEST_WINDOW = int(os.getenv('ALERT_DIGEST_WINDOW', 300))
+ALERT_SEND_RECOVERY = os.getenv('ALERT_SEND_RECOVERY', 'true').lower() == 'true'
+
+# Logging Configuration
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()  # 'text' or 'json'
+
 # Schedule Configuration (cron format)
 HEALTH_CHECK_HOUR = int(os.getenv('HEALTH_CHECK_HOUR', 9))
 HEALTH_CHECK_MINUTE = int(os.getenv('HEALTH_CHECK_MINUTE', 0))
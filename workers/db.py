@@ -54,6 +54,16 @@ def get_visitor_tokens_collection():
     return get_db().visitortokens
 
 
+def get_worker_runs_collection():
+    """Get the worker run checkpoints collection."""
+    return get_db().workerruns
+
+
+def get_warm_cache_collection():
+    """Get the warm-start probe cache snapshot collection."""
+    return get_db().warmcaches
+
+
 def close_connection():
     """Close the MongoDB connection."""
     global _client, _db
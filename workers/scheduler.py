@@ -15,15 +15,19 @@ from config import (
     HEALTH_CHECK_MINUTE,
     CLEANUP_HOUR,
     CLEANUP_MINUTE,
+    LOG_LEVEL,
+    LOG_FORMAT,
 )
 from workers.health_check import run_health_checks
 from workers.ssl_validator import run_ssl_checks
 from workers.seo_analyzer import run_seo_analysis
 from workers.cleanup import run_cleanup
+from workers.latency_baseline import run_latency_baselines
+from utils.logger import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Configure logging (records are written by a background queue listener)
+setup_logging(
+    level=getattr(logging, LOG_LEVEL, logging.INFO), json_format=LOG_FORMAT == "json"
 )
 logger = logging.getLogger(__name__)
 
@@ -31,9 +35,9 @@ logger = logging.getLogger(__name__)
 def job_listener(event):
     """Log job execution events."""
     if event.exception:
-        logger.error(f"Job {event.job_id} failed: {event.exception}")
+        logger.error("Job %s failed: %s", event.job_id, event.exception)
     else:
-        logger.info(f"Job {event.job_id} completed successfully")
+        logger.info("Job %s completed successfully", event.job_id)
 
 
 def main():
@@ -73,6 +77,33 @@ def main():
         name="SEO Metadata Analysis",
     )
 
+    # Latency baselines 15 minutes after health checks
+    scheduler.add_job(
+        run_latency_baselines,
+        "cron",
+        hour=HEALTH_CHECK_HOUR,
+        minute=(HEALTH_CHECK_MINUTE + 15) % 60,
+        id="latency_baselines",
+        name="Latency Baseline Recompute",
+    )
+
+    # Hourly continuations resume paused or interrupted runs (no-op otherwise)
+    for offset, (func, job_id, name) in enumerate(
+        [
+            (run_health_checks, "health_checks", "Website Health Checks"),
+            (run_ssl_checks, "ssl_checks", "SSL Certificate Validation"),
+            (run_seo_analysis, "seo_analysis", "SEO Metadata Analysis"),
+        ]
+    ):
+        scheduler.add_job(
+            func,
+            "cron",
+            minute=(HEALTH_CHECK_MINUTE + 30 + 5 * offset) % 60,
+            kwargs={"resume_only": True},
+            id=f"{job_id}_resume",
+            name=f"{name} (resume)",
+        )
+
     # Midnight cleanup
     scheduler.add_job(
         run_cleanup,
@@ -85,9 +116,9 @@ def main():
 
     logger.info("🚀 Python Worker Scheduler starting...")
     logger.info(
-        f"📅 Health checks scheduled at {HEALTH_CHECK_HOUR:02d}:{HEALTH_CHECK_MINUTE:02d}"
+        "📅 Health checks scheduled at %02d:%02d", HEALTH_CHECK_HOUR, HEALTH_CHECK_MINUTE
     )
-    logger.info(f"🧹 Cleanup scheduled at {CLEANUP_HOUR:02d}:{CLEANUP_MINUTE:02d}")
+    logger.info("🧹 Cleanup scheduled at %02d:%02d", CLEANUP_HOUR, CLEANUP_MINUTE)
 
     try:
         scheduler.start()
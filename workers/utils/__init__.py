@@ -1,10 +1,18 @@
 """
 Utility modules for Python workers.
 """
-from .email_sender import send_alert_email
-from .logger import get_logger
+from .email_sender import send_alert_email, send_digest_emails
+from .alert_digest import AlertDigest
+from .logger import get_logger, setup_logging
+from .probe_policy import get_probe_policy, CircuitOpenError, HostUnreachableError
 
 __all__ = [
     'send_alert_email',
+    'send_digest_emails',
+    'AlertDigest',
     'get_logger',
+    'setup_logging',
+    'get_probe_policy',
+    'CircuitOpenError',
+    'HostUnreachableError',
 ]
@@ -0,0 +1,100 @@
+"""
+Alert digest aggregation for health check notifications.
+Groups down/recovered websites per user so a large outage sends one email
+per user per window instead of one email per site.
+Down alerts are backed by an 'alertPending' flag on the website that is only
+cleared once the digest carrying them has been delivered.
+"""
+import logging
+from time import monotonic
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_websites_collection
+from config import ALERT_DIGEST_WINDOW, ALERT_SEND_RECOVERY
+from utils.email_sender import send_digest_emails
+
+logger = logging.getLogger(__name__)
+
+
+class AlertDigest:
+    """Collects state changes per user and flushes them as digest emails."""
+
+    def __init__(self, window_seconds: int = ALERT_DIGEST_WINDOW,
+                 send_recovery: bool = ALERT_SEND_RECOVERY):
+        self.window_seconds = window_seconds
+        self.send_recovery = send_recovery
+        self._pending = {}
+        self._window_started = None
+
+    def _entry(self, user: dict) -> dict:
+        key = user['_id']
+        if key not in self._pending:
+            self._pending[key] = {
+                'email': user['email'],
+                'name': user.get('name', 'User'),
+                'down': [],
+                'recovered': [],
+                'siteIds': [],
+            }
+        if self._window_started is None:
+            self._window_started = monotonic()
+        return self._pending[key]
+
+    def add_down(self, user: dict, website_url: str, site_id=None):
+        """
+        Queue a newly-down website for the user's next digest.
+
+        Args:
+            user: User document (needs '_id' and 'email')
+            website_url: URL of the website that went down
+            site_id: Website _id whose 'alertPending' flag to clear once sent
+        """
+        entry = self._entry(user)
+        entry['down'].append(website_url)
+        if site_id is not None:
+            entry['siteIds'].append(site_id)
+
+    def add_recovered(self, user: dict, website_url: str):
+        """Queue a recovered website for the user's next digest."""
+        if self.send_recovery:
+            self._entry(user)['recovered'].append(website_url)
+
+    def maybe_flush(self) -> int:
+        """
+        Flush pending digests if the aggregation window has elapsed.
+
+        Returns:
+            Number of digest emails sent
+        """
+        if self._window_started is None:
+            return 0
+        if monotonic() - self._window_started < self.window_seconds:
+            return 0
+        return self.flush()
+
+    def flush(self) -> int:
+        """
+        Send all pending digests and start a new window.
+
+        Returns:
+            Number of digest emails sent
+        """
+        digests = list(self._pending.values())
+        self._pending = {}
+        self._window_started = None
+
+        if not digests:
+            return 0
+
+        logger.info("Flushing alert digests for %d users", len(digests))
+        return send_digest_emails(digests, on_sent=self._mark_sent)
+
+    def _mark_sent(self, digest: dict):
+        if digest['siteIds']:
+            get_websites_collection().update_many(
+                {'_id': {'$in': digest['siteIds']}},
+                {'$unset': {'alertPending': ''}}
+            )
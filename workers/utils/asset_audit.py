@@ -0,0 +1,203 @@
+"""
+Page-weight and asset latency audit for the SEO worker.
+Checks a page's images, scripts and stylesheets with HEAD (or one-byte
+ranged GET) requests, concurrently per page and deduplicated across a run,
+and summarizes total weight, the largest assets and slow or broken ones.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+from urllib.parse import urljoin, urldefrag
+
+import httpx
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    ASSET_AUDIT_CONCURRENCY,
+    ASSET_AUDIT_MAX_ASSETS,
+    ASSET_AUDIT_TIMEOUT,
+    ASSET_SLOW_MS,
+)
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; WebMonitor SEO Analyzer/1.0)"}
+
+# Number of entries kept in the largest/slow/broken lists
+REPORT_LIMIT = 5
+
+
+def collect_assets(soup, base_url: str) -> list[tuple[str, str]]:
+    """
+    Collect referenced images, scripts and stylesheets from a parsed page.
+
+    Args:
+        soup: BeautifulSoup document
+        base_url: URL the page was served from, for resolving relative links
+
+    Returns:
+        Distinct (absolute_url, asset_type) pairs in document order
+    """
+    candidates = []
+    candidates += [(tag.get("src"), "image") for tag in soup.find_all("img")]
+    candidates += [(tag.get("src"), "script") for tag in soup.find_all("script")]
+    candidates += [
+        (tag.get("href"), "stylesheet")
+        for tag in soup.find_all("link")
+        if "stylesheet" in (tag.get("rel") or [])
+    ]
+
+    assets = {}
+    for ref, asset_type in candidates:
+        if not ref or ref.startswith("data:"):
+            continue
+        url = urldefrag(urljoin(base_url, ref.strip()))[0]
+        if url.startswith(("http://", "https://")):
+            assets.setdefault(url, asset_type)
+
+    return list(assets.items())
+
+
+def _size_from_headers(response: httpx.Response) -> int | None:
+    content_range = response.headers.get("content-range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+
+    content_length = response.headers.get("content-length")
+    if content_length and content_length.isdigit() and response.status_code != 206:
+        return int(content_length)
+    return None
+
+
+class AssetAuditor:
+    """Checks page assets and remembers results for the rest of the run."""
+
+    def __init__(self, client: httpx.Client,
+                 concurrency: int = ASSET_AUDIT_CONCURRENCY,
+                 max_assets: int = ASSET_AUDIT_MAX_ASSETS,
+                 timeout: float = ASSET_AUDIT_TIMEOUT):
+        self.client = client
+        self.concurrency = concurrency
+        self.max_assets = max_assets
+        self.timeout = timeout
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, url: str) -> dict:
+        start = perf_counter()
+        try:
+            response = self.client.head(url, headers=HEADERS, timeout=self.timeout)
+            size = _size_from_headers(response)
+
+            # Some servers reject HEAD or omit the length; ask for one byte instead
+            if response.status_code >= 400 or size is None:
+                # Only time the request that produced the result
+                start = perf_counter()
+                # Streamed so the body is never downloaded if Range is ignored
+                with self.client.stream(
+                    "GET", url, headers={**HEADERS, "Range": "bytes=0-0"}, timeout=self.timeout
+                ) as response:
+                    size = _size_from_headers(response)
+
+            return {
+                "status": response.status_code,
+                "bytes": size,
+                "ms": int((perf_counter() - start) * 1000),
+                "error": None if response.status_code < 400 else f"HTTP {response.status_code}",
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": None,
+                "bytes": None,
+                "ms": int((perf_counter() - start) * 1000),
+                "error": str(e) or type(e).__name__,
+            }
+
+    def check(self, url: str) -> dict:
+        """
+        Check one asset, reusing the result if any page already checked it.
+
+        Args:
+            url: Absolute asset URL
+
+        Returns:
+            Dict with 'status', 'bytes', 'ms' and 'error'
+        """
+        with self._lock:
+            future = self._results.get(url)
+            owner = future is None
+            if owner:
+                future = self._results[url] = Future()
+
+        if owner:
+            try:
+                future.set_result(self._fetch(url))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def audit(self, soup, base_url: str, page_bytes: int) -> dict:
+        """
+        Audit every asset referenced by a page.
+
+        Args:
+            soup: BeautifulSoup document
+            base_url: URL the page was served from
+            page_bytes: Size of the HTML document itself
+
+        Returns:
+            Dict for the 'assets' field of the SEO subdocument
+        """
+        return self.audit_assets(collect_assets(soup, base_url), page_bytes)
+
+    def audit_assets(self, assets: list, page_bytes: int, count: int | None = None) -> dict:
+        """
+        Audit an already collected asset list (e.g. for an unchanged page).
+
+        Args:
+            assets: (absolute_url, asset_type) pairs as from collect_assets()
+            page_bytes: Size of the HTML document itself
+            count: Total assets on the page, if the list was truncated
+
+        Returns:
+            Dict for the 'assets' field of the SEO subdocument
+        """
+        audited = assets[:self.max_assets]
+
+        results = []
+        if audited:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(audited))) as pool:
+                checks = pool.map(self.check, [url for url, _ in audited])
+                results = [
+                    {"url": url, "type": asset_type, **result}
+                    for (url, asset_type), result in zip(audited, checks)
+                ]
+
+        sized = [r for r in results if r["bytes"] is not None and not r["error"]]
+        total_bytes = page_bytes + sum(r["bytes"] for r in sized)
+
+        largest = sorted(sized, key=lambda r: r["bytes"], reverse=True)[:REPORT_LIMIT]
+        slow = sorted(
+            (r for r in results if not r["error"] and r["ms"] >= ASSET_SLOW_MS),
+            key=lambda r: r["ms"],
+            reverse=True,
+        )
+        broken = [r for r in results if r["error"]]
+
+        return {
+            "count": len(assets) if count is None else count,
+            "audited": len(results),
+            "totalBytes": total_bytes,
+            "unknownSize": len(results) - len(sized) - len(broken),
+            "largest": [{"url": r["url"], "type": r["type"], "bytes": r["bytes"]} for r in largest],
+            "slowCount": len(slow),
+            "slow": [{"url": r["url"], "type": r["type"], "ms": r["ms"]} for r in slow[:REPORT_LIMIT]],
+            "brokenCount": len(broken),
+            "broken": [
+                {"url": r["url"], "type": r["type"], "status": r["status"], "error": r["error"]}
+                for r in broken[:REPORT_LIMIT]
+            ],
+        }
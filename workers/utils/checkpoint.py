@@ -0,0 +1,185 @@
+"""
+Run checkpoints for resumable worker runs.
+Progress (last processed _id per tenant and counters) is stored in MongoDB
+so a run that crashes or hits its time budget resumes where it stopped.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone, timedelta
+from time import monotonic
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_worker_runs_collection
+from config import (
+    WORKER_TIME_BUDGET,
+    CHECKPOINT_SAVE_EVERY,
+    CHECKPOINT_MAX_AGE,
+    CHECKPOINT_LEASE,
+    CHECKPOINT_RETENTION,
+    WORKER_RESUME_ONLY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RunCheckpoint:
+    """Tracks the progress of one worker run in the workerruns collection."""
+
+    def __init__(self, worker: str, time_budget: float = WORKER_TIME_BUDGET,
+                 save_every: int = CHECKPOINT_SAVE_EVERY,
+                 resume_only: bool = WORKER_RESUME_ONLY):
+        self.worker = worker
+        self.time_budget = time_budget
+        self.save_every = save_every
+        self.resume_only = resume_only
+        self.run_id = None
+        self.cursors = {}
+        self.counters = {}
+        self.resumed = False
+        self._unsaved = 0
+        self._slice_started = None
+
+    def start(self, counters: dict) -> 'RunCheckpoint | None':
+        """
+        Resume the latest unfinished run for this worker, or begin a new one.
+
+        Args:
+            counters: Initial counter values for a fresh run
+
+        Returns:
+            self, for chaining; None if there is nothing to do (another
+            invocation is still running, or resume_only is set and no
+            unfinished run exists)
+        """
+        runs = get_worker_runs_collection()
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=CHECKPOINT_MAX_AGE)
+
+        # Keep the collection bounded: finished runs are only kept for a while
+        runs.delete_many(
+            {'worker': self.worker, 'status': {'$in': ['completed', 'abandoned']},
+             'updatedAt': {'$lt': now - timedelta(seconds=CHECKPOINT_RETENTION)}}
+        )
+
+        # Unfinished runs that stopped making progress long ago are abandoned
+        runs.update_many(
+            {'worker': self.worker, 'status': {'$in': ['running', 'paused']},
+             'updatedAt': {'$lt': cutoff}},
+            {'$set': {'status': 'abandoned', 'updatedAt': now}}
+        )
+
+        previous = runs.find_one(
+            {'worker': self.worker, 'status': {'$in': ['running', 'paused']}},
+            sort=[('startedAt', -1)]
+        )
+
+        if previous and previous['status'] == 'running':
+            updated_at = previous['updatedAt']
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            if now - updated_at < timedelta(seconds=CHECKPOINT_LEASE):
+                logger.info("%s run %s is still in progress; not starting another",
+                            self.worker, previous['runId'])
+                return None
+
+        if previous:
+            self.run_id = previous['runId']
+            self.cursors = previous.get('cursors') or {}
+            self.counters = {**counters, **previous.get('counters', {})}
+            self.resumed = True
+            runs.update_one(
+                {'runId': self.run_id},
+                {'$set': {'status': 'running', 'updatedAt': now},
+                 '$inc': {'slices': 1}}
+            )
+            logger.info("Resuming %s run %s (%d tenants in progress)",
+                        self.worker, self.run_id, len(self.cursors))
+        elif self.resume_only:
+            logger.info("No unfinished %s run to resume", self.worker)
+            return None
+        else:
+            self.run_id = uuid.uuid4().hex
+            self.counters = dict(counters)
+            runs.insert_one({
+                'runId': self.run_id,
+                'worker': self.worker,
+                'status': 'running',
+                'cursors': {},
+                'counters': self.counters,
+                'slices': 1,
+                'startedAt': now,
+                'updatedAt': now,
+            })
+
+        self._slice_started = monotonic()
+        return self
+
+    def pending(self, docs: list[dict], key) -> list[dict]:
+        """
+        Drop documents already processed by this run.
+
+        Args:
+            docs: Candidate documents
+            key: Callable returning the cursor key (tenant) for a document
+
+        Returns:
+            Documents past their tenant's cursor
+        """
+        if not self.cursors:
+            return docs
+        return [
+            doc for doc in docs
+            if self.cursors.get(key(doc)) is None or doc['_id'] > self.cursors[key(doc)]
+        ]
+
+    def advance(self, key: str, cursor=None, **increments):
+        """
+        Record progress for one tenant and bump counters.
+
+        Args:
+            key: Cursor key (tenant) the processed document belongs to
+            cursor: Highest _id for the key whose predecessors are all
+                processed, or None if it did not move
+            **increments: Counter deltas to apply
+        """
+        if cursor is not None:
+            self.cursors[key] = cursor
+        for name, delta in increments.items():
+            self.counters[name] = self.counters.get(name, 0) + delta
+
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def time_exhausted(self) -> bool:
+        """Return True once this slice has used up its time budget."""
+        if not self.time_budget:
+            return False
+        return monotonic() - self._slice_started >= self.time_budget
+
+    def save(self, status: str = 'running'):
+        """Persist progress to MongoDB."""
+        update = {
+            'status': status,
+            'cursors': self.cursors,
+            'counters': self.counters,
+            'updatedAt': datetime.now(timezone.utc),
+        }
+        if status == 'completed':
+            update['completedAt'] = update['updatedAt']
+
+        get_worker_runs_collection().update_one({'runId': self.run_id}, {'$set': update})
+        self._unsaved = 0
+
+    def pause(self):
+        """Persist progress so the next invocation continues this run."""
+        self.save(status='paused')
+        logger.info("⏸ %s run %s paused (%d tenants in progress)",
+                    self.worker, self.run_id, len(self.cursors))
+
+    def complete(self):
+        """Mark the run as finished."""
+        self.save(status='completed')
@@ -0,0 +1,226 @@
+"""
+Streaming content assertions for health checks.
+The body is decoded incrementally (declared charset, else UTF-8) and
+required/forbidden keywords are matched case-insensitively (Unicode
+casefolding) with a single Aho-Corasick automaton fed chunk by chunk,
+alongside an optional regex and a body size limit; reading stops as soon as
+the outcome is known.
+"""
+import codecs
+import re
+from collections import deque
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CONTENT_MAX_SCAN_BYTES, CONTENT_REGEX_WINDOW
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over string patterns that keeps state across chunks."""
+
+    def __init__(self, patterns: list[str]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+        self._state = 0
+
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                    self._goto[node][char] = child
+                node = child
+            self._out[node] = self._out[node] | {index}
+
+        # Breadth-first pass to link each node to its longest proper suffix
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] | self._out[self._fail[child]]
+
+    def feed(self, data: str) -> set[int]:
+        """
+        Advance the automaton over a chunk.
+
+        Args:
+            data: Next chunk of the (casefolded) decoded text
+
+        Returns:
+            Indices of patterns that ended inside this chunk
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = self._state
+        found = set()
+
+        for char in data:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+
+        self._state = state
+        return found
+
+
+def declared_charset(response) -> str | None:
+    """Return the charset declared in a response's Content-Type header, if any."""
+    for param in response.headers.get('content-type', '').split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+
+class ContentAssertions:
+    """Per-site expectations about a response body."""
+
+    def __init__(self, required: list[str] = (), forbidden: list[str] = (),
+                 regex: str | None = None, max_bytes: int | None = None):
+        self.required = [k for k in required if k]
+        self.forbidden = [k for k in forbidden if k]
+        self.regex = re.compile(regex) if regex else None
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_site(cls, site: dict) -> 'ContentAssertions | None':
+        """Build assertions from a website's 'assertions' field, if any are set."""
+        config = site.get('assertions') or {}
+        assertions = cls(
+            required=config.get('required') or [],
+            forbidden=config.get('forbidden') or [],
+            regex=config.get('regex'),
+            max_bytes=config.get('maxBytes'),
+        )
+        if not (assertions.required or assertions.forbidden or assertions.regex
+                or assertions.max_bytes):
+            return None
+        return assertions
+
+    def _search(self, text: str, start: int, final: bool) -> bool:
+        """
+        Look for a regex match starting at or after start.
+
+        Until the body ends, matches must finish before the last
+        CONTENT_REGEX_WINDOW characters, which are held back so '$', '\\b'
+        and lookaheads are not satisfied by a chunk boundary.
+        """
+        limit = len(text) if final else len(text) - CONTENT_REGEX_WINDOW
+        return any(m.end() <= limit for m in self.regex.finditer(text, start))
+
+    @staticmethod
+    def _slide(text: str) -> tuple[str, int]:
+        """
+        Trim the regex buffer to what the next search needs.
+
+        Matches (at most CONTENT_REGEX_WINDOW long) that ended in the held-back
+        tail start within the last two windows; one more window is kept
+        before that as context for '^', '\\b' and lookbehinds.
+
+        Returns:
+            Tuple of (kept text, index where the next search starts)
+        """
+        text = text[-3 * CONTENT_REGEX_WINDOW:]
+        return text, max(0, len(text) - 2 * CONTENT_REGEX_WINDOW)
+
+    def evaluate(self, chunks, encoding: str | None = None) -> dict:
+        """
+        Check a streamed body against the assertions.
+
+        Reading stops once a forbidden keyword or the size limit is hit, or
+        once everything required has been seen and nothing left to check
+        depends on the rest of the body.
+
+        Args:
+            chunks: Iterable of body byte chunks
+            encoding: Declared response charset; UTF-8 if omitted or unknown
+
+        Returns:
+            Dict with 'passed', 'failures', 'bytesRead' and 'complete'
+        """
+        keywords = [k.casefold() for k in self.required + self.forbidden]
+        matcher = KeywordMatcher(keywords) if keywords else None
+        required_left = set(range(len(self.required)))
+        forbidden_hit = set()
+
+        regex_matched = self.regex is None
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        # Text kept from earlier chunks and the index where new matches may start
+        window = ''
+        start = 0
+
+        # Absence can only be proven by reading to the end (or the scan cap)
+        needs_full_body = bool(self.forbidden or self.max_bytes)
+
+        failures = []
+        bytes_read = 0
+        complete = True
+
+        for chunk in chunks:
+            bytes_read += len(chunk)
+
+            if self.max_bytes and bytes_read > self.max_bytes:
+                failures.append(f"Body exceeds {self.max_bytes} bytes")
+                complete = False
+                break
+
+            # The incremental decoder holds back characters split across chunks
+            text = decoder.decode(chunk)
+
+            if matcher:
+                for index in matcher.feed(text.casefold()):
+                    if index < len(self.required):
+                        required_left.discard(index)
+                    else:
+                        forbidden_hit.add(index - len(self.required))
+                if forbidden_hit:
+                    complete = False
+                    break
+
+            if not regex_matched:
+                window += text
+                regex_matched = self._search(window, start, final=False)
+                window, start = self._slide(window)
+
+            if not required_left and regex_matched and not needs_full_body:
+                complete = False
+                break
+
+            if bytes_read >= CONTENT_MAX_SCAN_BYTES:
+                complete = False
+                break
+        else:
+            # End of body: the held-back tail can now match, anchors included
+            if not regex_matched:
+                window += decoder.decode(b'', final=True)
+                regex_matched = self._search(window, start, final=True)
+
+        for index in sorted(forbidden_hit):
+            failures.append(f"Forbidden keyword found: {self.forbidden[index]}")
+        for index in sorted(required_left):
+            failures.append(f"Missing required keyword: {self.required[index]}")
+        if not regex_matched:
+            failures.append(f"Pattern not found: {self.regex.pattern}")
+
+        return {
+            'passed': not failures,
+            'failures': failures,
+            'bytesRead': bytes_read,
+            'complete': complete,
+        }
@@ -0,0 +1,108 @@
+"""
+Process-wide DNS resolution cache for probes.
+Wraps socket.getaddrinfo so requests, httpx and raw SSL sockets share
+lookups within a run, and lets a previous run's results seed the next one
+for as long as they are fresh.
+"""
+import ipaddress
+import socket
+import time
+from datetime import datetime, timezone
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DNS_CACHE_TTL
+
+# Global cache instance
+_cache = None
+
+
+def _is_ip_literal(host) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class DnsCache:
+    """Caches successful getaddrinfo results for a fixed time-to-live."""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._original = None
+
+    def install(self):
+        """Route socket.getaddrinfo through the cache (no-op if TTL is 0)."""
+        if self.ttl and self._original is None:
+            self._original = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        """Restore the original socket.getaddrinfo."""
+        if self._original is not None:
+            socket.getaddrinfo = self._original
+            self._original = None
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        resolve = self._original or socket.getaddrinfo
+        if not isinstance(host, str) or _is_ip_literal(host):
+            return resolve(host, port, family, type, proto, flags)
+
+        key = f"{host.lower()}|{port}|{int(family)}|{int(type)}|{proto}|{flags}"
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+
+        # Failures are not cached so DNS outages still surface on the next probe
+        result = resolve(host, port, family, type, proto, flags)
+        self._entries[key] = (time.time() + self.ttl, result)
+        return result
+
+    def snapshot(self) -> dict:
+        """
+        Export unexpired lookups.
+
+        Returns:
+            Dict of lookup key to {'expiresAt', 'addresses'}
+        """
+        now = time.time()
+        return {
+            key: {
+                'expiresAt': datetime.fromtimestamp(expires_at, timezone.utc),
+                'addresses': [
+                    [int(fam), int(kind), proto, canonname, list(sockaddr)]
+                    for fam, kind, proto, canonname, sockaddr in result
+                ],
+            }
+            for key, (expires_at, result) in list(self._entries.items())
+            if expires_at > now
+        }
+
+    def restore(self, key: str, data: dict):
+        """Load a lookup saved by a previous run, if it has not expired."""
+        expires_at = data.get('expiresAt')
+        if not isinstance(expires_at, datetime):
+            return
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at.timestamp() <= time.time() or key in self._entries:
+            return
+
+        result = [
+            (socket.AddressFamily(fam), socket.SocketKind(kind), proto, canonname, tuple(sockaddr))
+            for fam, kind, proto, canonname, sockaddr in data.get('addresses') or []
+        ]
+        if result:
+            self._entries[key] = (expires_at.timestamp(), result)
+
+
+def get_dns_cache() -> DnsCache:
+    """Get or create the shared DNS cache."""
+    global _cache
+    if _cache is None:
+        _cache = DnsCache()
+    return _cache
@@ -1,6 +1,6 @@
 """
 Email sender utility for alert notifications.
-Sends email alerts when websites go down.
+Sends email alerts when websites go down, individually or as per-user digests.
 """
 import logging
 import smtplib
@@ -101,14 +101,168 @@ We'll continue monitoring and notify you when it comes back online.
             server.login(EMAIL_USER, EMAIL_PASS)
             server.send_message(msg)
         
-        logger.info(f"Alert email sent to {to_email} for {website_url}")
+        logger.info("Alert email sent to %s for %s", to_email, website_url)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to send alert email: {e}")
+        logger.error("Failed to send alert email: %s", e)
         return False
 
 
+def _build_digest_message(to_email: str, user_name: str, down_urls: list[str],
+                          recovered_urls: list[str]) -> MIMEMultipart:
+    """
+    Build a single digest email covering every site that changed state.
+    
+    Args:
+        to_email: Recipient email address
+        user_name: User's name for personalization
+        down_urls: URLs that went down during the window
+        recovered_urls: URLs that came back online during the window
+        
+    Returns:
+        The assembled multipart message
+    """
+    if down_urls and recovered_urls:
+        subject = f"⚠️ {len(down_urls)} down, {len(recovered_urls)} recovered"
+    elif len(down_urls) == 1:
+        subject = f"⚠️ Website Down Alert: {down_urls[0]}"
+    elif down_urls:
+        subject = f"⚠️ {len(down_urls)} websites are down"
+    elif len(recovered_urls) == 1:
+        subject = f"✅ Website Recovered: {recovered_urls[0]}"
+    else:
+        subject = f"✅ {len(recovered_urls)} websites are back online"
+    
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = EMAIL_USER
+    msg['To'] = to_email
+    
+    check_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Plain text version
+    sections = []
+    if down_urls:
+        sections.append("These monitored websites are currently DOWN:\n\n"
+                        + "\n".join(f"  - {url}" for url in down_urls))
+    if recovered_urls:
+        sections.append("These monitored websites are back ONLINE:\n\n"
+                        + "\n".join(f"  - {url}" for url in recovered_urls))
+    body = "\n\n".join(sections)
+    
+    text_content = f"""
+Hi {user_name},
+
+{body}
+
+Checked at: {check_time}
+
+We'll continue monitoring and notify you of further changes.
+
+- WebMonitor Team
+    """.strip()
+    
+    # HTML version
+    html_sections = ""
+    if down_urls:
+        items = "".join(f'<p class="url">{url}</p>' for url in down_urls)
+        html_sections += f"""
+        <div class="alert">
+            <strong>These monitored websites are currently DOWN:</strong>
+            {items}
+        </div>"""
+    if recovered_urls:
+        items = "".join(f'<p class="url">{url}</p>' for url in recovered_urls)
+        html_sections += f"""
+        <div class="recovered">
+            <strong>These monitored websites are back ONLINE:</strong>
+            {items}
+        </div>"""
+    
+    html_content = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .alert {{ background: #fee2e2; border-left: 4px solid #ef4444; padding: 15px; margin: 20px 0; }}
+        .recovered {{ background: #dcfce7; border-left: 4px solid #22c55e; padding: 15px; margin: 20px 0; }}
+        .url {{ font-family: monospace; background: #f3f4f6; padding: 5px 10px; border-radius: 4px; }}
+        .footer {{ margin-top: 30px; font-size: 12px; color: #666; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h2>{subject}</h2>
+        
+        <p>Hi {user_name},</p>
+        {html_sections}
+        
+        <p><small>Checked at: {check_time}</small></p>
+        <p>We'll continue monitoring and notify you of further changes.</p>
+        
+        <div class="footer">
+            <p>- WebMonitor Team</p>
+        </div>
+    </div>
+</body>
+</html>
+    """.strip()
+    
+    msg.attach(MIMEText(text_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+
+def send_digest_emails(digests: list[dict], on_sent=None) -> int:
+    """
+    Send one digest email per user over a single SMTP session.
+    
+    Args:
+        digests: List of dicts with 'email', 'name', 'down' and 'recovered' keys
+        on_sent: Optional callback invoked with each digest that was delivered
+        
+    Returns:
+        Number of digest emails sent successfully
+    """
+    if not digests:
+        return 0
+    
+    if not EMAIL_USER or not EMAIL_PASS:
+        logger.warning("Email credentials not configured, skipping alert digests")
+        return 0
+    
+    sent = 0
+    try:
+        with smtplib.SMTP(EMAIL_HOST, EMAIL_PORT) as server:
+            server.starttls()
+            server.login(EMAIL_USER, EMAIL_PASS)
+            
+            for digest in digests:
+                msg = _build_digest_message(
+                    to_email=digest['email'],
+                    user_name=digest.get('name', 'User'),
+                    down_urls=digest.get('down', []),
+                    recovered_urls=digest.get('recovered', []),
+                )
+                try:
+                    server.send_message(msg)
+                    sent += 1
+                    if on_sent:
+                        on_sent(digest)
+                except smtplib.SMTPException as e:
+                    logger.error("Failed to send alert digest to %s: %s", digest['email'], e)
+        
+        logger.info("Sent %d/%d alert digests", sent, len(digests))
+        
+    except Exception as e:
+        logger.error("Failed to send alert digests: %s", e)
+    
+    return sent
+
+
 if __name__ == '__main__':
     # Test email sending
     logging.basicConfig(level=logging.INFO)
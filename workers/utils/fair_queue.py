@@ -0,0 +1,220 @@
+"""
+Tenant-fair scheduling for probe loops.
+Websites are queued per owner (userId / visitorToken) and dispatched to a
+shared worker pool by weighted fair queuing: each tenant's next probe is
+stamped with a virtual finish time of probes served / tier weight, so
+registered users get a larger share than guests without starving them.
+A per-tenant cap on in-flight slots keeps one large tenant from delaying
+everyone else; probes multiplexed onto one origin connection share a slot.
+"""
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    WORKER_CONCURRENCY,
+    TENANT_CONCURRENCY,
+    HTTP2_MAX_STREAMS,
+    TENANT_WEIGHT_REGISTERED,
+    TENANT_WEIGHT_GUEST,
+    TENANT_WEIGHT_UNOWNED,
+)
+
+# Priority tiers (lower wins ties between equal virtual finish times)
+TIER_REGISTERED = 0
+TIER_GUEST = 1
+TIER_UNOWNED = 2
+
+TIER_WEIGHTS = {
+    TIER_REGISTERED: TENANT_WEIGHT_REGISTERED,
+    TIER_GUEST: TENANT_WEIGHT_GUEST,
+    TIER_UNOWNED: TENANT_WEIGHT_UNOWNED,
+}
+
+
+def tenant_of(site: dict) -> tuple[str, int]:
+    """
+    Return the tenant key and priority tier owning a website.
+
+    Args:
+        site: Website document
+
+    Returns:
+        Tuple of (tenant_key, tier)
+    """
+    if site.get('userId'):
+        return f"user:{site['userId']}", TIER_REGISTERED
+    if site.get('visitorToken'):
+        return f"guest:{site['visitorToken']}", TIER_GUEST
+    return 'unowned', TIER_UNOWNED
+
+
+class _Tenant:
+    """Pending work and in-flight bookkeeping for one tenant."""
+
+    __slots__ = ('key', 'tier', 'weight', 'queue', 'served', 'in_flight', 'groups',
+                 'in_heap', 'dispatched', 'completed')
+
+    def __init__(self, key: str, tier: int):
+        self.key = key
+        self.tier = tier
+        self.weight = TIER_WEIGHTS[tier] or 1
+        self.queue = deque()
+        self.served = 0
+        self.in_flight = 0
+        # In-flight probes per multiplexed group; each group occupies one slot
+        self.groups = {}
+        self.in_heap = False
+        # Ids in dispatch order and those finished, for the resume cursor
+        self.dispatched = deque()
+        self.completed = set()
+
+    @property
+    def finish_time(self) -> float:
+        """Virtual finish time of this tenant's next probe."""
+        return (self.served + 1) / self.weight
+
+    @property
+    def slots(self) -> int:
+        """In-flight slots: one per ungrouped probe, one per active group."""
+        return self.in_flight - sum(self.groups.values()) + len(self.groups)
+
+
+class FairScheduler:
+    """Weighted fair queue across tenants with per-tenant concurrency caps."""
+
+    def __init__(self, sites: list[dict], concurrency: int = WORKER_CONCURRENCY,
+                 tenant_concurrency: int = TENANT_CONCURRENCY, group_of=None,
+                 group_streams: int = HTTP2_MAX_STREAMS):
+        """
+        Args:
+            sites: Website documents to probe
+            concurrency: Probes in flight across all tenants
+            tenant_concurrency: In-flight slots per tenant
+            group_of: Optional callable returning a key for websites probed
+                over a shared multiplexed connection (e.g. their origin), or
+                None; a tenant's probes in one group take a single slot
+            group_streams: Probes in flight per group within a tenant
+        """
+        self.concurrency = max(1, concurrency)
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.group_of = group_of
+        self.group_streams = max(1, group_streams)
+        self._tenants = {}
+        self._heap = []
+
+        for site in sorted(sites, key=lambda s: s['_id']):
+            key, tier = tenant_of(site)
+            tenant = self._tenants.get(key)
+            if tenant is None:
+                tenant = self._tenants[key] = _Tenant(key, tier)
+            tenant.queue.append(site)
+
+        for tenant in self._tenants.values():
+            self._push(tenant)
+
+    @property
+    def tenant_count(self) -> int:
+        return len(self._tenants)
+
+    def _group(self, site: dict):
+        return self.group_of(site) if self.group_of else None
+
+    def _can_dispatch(self, tenant: _Tenant) -> bool:
+        if not tenant.queue:
+            return False
+        group = self._group(tenant.queue[0])
+        if group is not None and group in tenant.groups:
+            # Another stream on a connection the tenant already holds
+            return tenant.groups[group] < self.group_streams
+        return tenant.slots < self.tenant_concurrency
+
+    def _push(self, tenant: _Tenant):
+        if not tenant.in_heap and self._can_dispatch(tenant):
+            # Smallest virtual finish time goes first; heavier tiers advance slower
+            heapq.heappush(self._heap, (tenant.finish_time, tenant.tier, tenant.key))
+            tenant.in_heap = True
+
+    def _next(self) -> tuple[_Tenant, dict] | None:
+        if not self._heap:
+            return None
+
+        _, _, key = heapq.heappop(self._heap)
+        tenant = self._tenants[key]
+        tenant.in_heap = False
+
+        site = tenant.queue.popleft()
+        tenant.served += 1
+        tenant.in_flight += 1
+        group = self._group(site)
+        if group is not None:
+            tenant.groups[group] = tenant.groups.get(group, 0) + 1
+        tenant.dispatched.append(site['_id'])
+
+        self._push(tenant)
+        return tenant, site
+
+    def _finish(self, tenant: _Tenant, site: dict):
+        tenant.in_flight -= 1
+        group = self._group(site)
+        if group is not None:
+            tenant.groups[group] -= 1
+            if not tenant.groups[group]:
+                del tenant.groups[group]
+        tenant.completed.add(site['_id'])
+
+        # Advance the cursor over the contiguous prefix of finished ids
+        cursor = None
+        while tenant.dispatched and tenant.dispatched[0] in tenant.completed:
+            cursor = tenant.dispatched.popleft()
+            tenant.completed.discard(cursor)
+
+        self._push(tenant)
+        return cursor
+
+    def run(self, func, on_result, should_stop=None) -> bool:
+        """
+        Probe every queued website and hand results back in this thread.
+
+        Args:
+            func: Callable taking a website and returning its probe result;
+                runs on the worker pool
+            on_result: Callable (site, result, tenant_key, cursor) run on the
+                calling thread, where cursor is the tenant's highest _id whose
+                predecessors have all finished (or None if unchanged)
+            should_stop: Optional callable; once it returns True no new
+                probes are dispatched and in-flight ones are drained
+
+        Returns:
+            True if every website was processed, False if stopped early
+        """
+        in_flight = {}
+        stopped = False
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                if not stopped and should_stop and should_stop():
+                    stopped = True
+
+                while not stopped and len(in_flight) < self.concurrency:
+                    item = self._next()
+                    if item is None:
+                        break
+                    tenant, site = item
+                    in_flight[pool.submit(func, site)] = (tenant, site)
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tenant, site = in_flight.pop(future)
+                    result = future.result()
+                    cursor = self._finish(tenant, site)
+                    on_result(site, result, tenant.key, cursor)
+
+        return not self._heap
@@ -0,0 +1,69 @@
+"""
+Shared HTTP/2 client for probing many URLs on the same origin.
+Concurrent requests to one origin from the worker pool become streams on a
+single multiplexed connection; servers without HTTP/2 support fall back to
+HTTP/1.1 keep-alive transparently via ALPN.
+"""
+import logging
+from urllib.parse import urlparse
+
+import httpx
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import HTTP2_MIN_URLS_PER_ORIGIN
+
+logger = logging.getLogger(__name__)
+
+# Global client instance
+_client = None
+
+_REQUESTS_VERSIONS = {10: 'HTTP/1.0', 11: 'HTTP/1.1'}
+
+
+def get_http2_client() -> httpx.Client:
+    """Get or create the shared HTTP/2-capable client."""
+    global _client
+    if _client is None:
+        _client = httpx.Client(http2=True, follow_redirects=True)
+    return _client
+
+
+def close_http2_client():
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client:
+        _client.close()
+        _client = None
+
+
+def origin_of(url: str) -> str:
+    """Return the scheme://host[:port] origin of a URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+def multiplexed_origins(urls: list[str], min_urls: int = HTTP2_MIN_URLS_PER_ORIGIN) -> dict:
+    """
+    Group distinct URLs by origin, keeping only origins worth a shared connection.
+
+    Args:
+        urls: URLs to group
+        min_urls: Minimum number of URLs for an origin to be multiplexed
+
+    Returns:
+        Dict mapping origin to its list of URLs
+    """
+    groups = {}
+    for url in dict.fromkeys(urls):
+        groups.setdefault(origin_of(url), []).append(url)
+    return {origin: group for origin, group in groups.items() if len(group) >= min_urls}
+
+
+def protocol_of(response) -> str | None:
+    """Return the negotiated HTTP version of an httpx or requests response."""
+    if isinstance(response, httpx.Response):
+        return response.http_version
+    return _REQUESTS_VERSIONS.get(getattr(response.raw, 'version', None))
@@ -0,0 +1,94 @@
+"""
+Compact, mergeable latency sketches for per-site response times.
+Samples are counted in logarithmic buckets (DDSketch-style) so any quantile
+can be estimated within a fixed relative error using O(1) space per site.
+"""
+import math
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LATENCY_SKETCH_ACCURACY, LATENCY_EWMA_ALPHA
+
+# Bucket i covers latencies in (GAMMA^(i-1), GAMMA^i] milliseconds
+GAMMA = (1 + LATENCY_SKETCH_ACCURACY) / (1 - LATENCY_SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_index(value_ms: float) -> int:
+    """Return the sketch bucket index for a latency in milliseconds."""
+    return math.ceil(math.log(max(value_ms, 1.0)) / _LOG_GAMMA)
+
+
+def bucket_value(index) -> float:
+    """Return the representative latency (ms) for a bucket index or array of indices."""
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+def sketch_update(latency: dict | None, value_ms: float) -> dict:
+    """
+    Build the MongoDB update that adds one sample to a site's sketch.
+
+    Bucket counts are incremented in place with $inc so concurrent updates
+    merge naturally; the sample count and EWMA are derived from the previously
+    stored values and set outright, since documents created by the backend may
+    hold null there (and $inc fails on null).
+
+    Args:
+        latency: The site's current 'latency' subdocument, if any
+        value_ms: Observed response time in milliseconds
+
+    Returns:
+        Dict with '$inc' and '$set' sections for update_one
+    """
+    latency = latency or {}
+    previous = latency.get('ewma')
+    if previous is None:
+        ewma = float(value_ms)
+    else:
+        ewma = previous + LATENCY_EWMA_ALPHA * (value_ms - previous)
+
+    return {
+        '$inc': {
+            f'latency.sketch.{bucket_index(value_ms)}': 1,
+        },
+        '$set': {
+            'latency.count': (latency.get('count') or 0) + 1,
+            'latency.ewma': round(ewma, 1),
+        },
+    }
+
+
+def merge_sketches(*sketches: dict) -> dict:
+    """Merge bucket counts from several sketches into a new sketch."""
+    merged = {}
+    for sketch in sketches:
+        for key, count in (sketch or {}).items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def quantile(sketch: dict, q: float) -> float | None:
+    """
+    Estimate a quantile from a single sketch.
+
+    Args:
+        sketch: Mapping of bucket index (as string) to count
+        q: Quantile in [0, 1]
+
+    Returns:
+        Estimated latency in milliseconds, or None for an empty sketch
+    """
+    buckets = sorted((int(key), count) for key, count in (sketch or {}).items() if count > 0)
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+
+    rank = q * total
+    running = 0
+    for index, count in buckets:
+        running += count
+        if running >= rank:
+            return bucket_value(index)
+    return bucket_value(buckets[-1][0])
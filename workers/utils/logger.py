@@ -2,9 +2,21 @@
 Logging utilities for Python workers.
 Provides structured logging with consistent formatting.
 """
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Attributes present on every LogRecord; anything else was passed via `extra`
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'taskName',
+}
+
+_listener = None
 
 
 class WorkerFormatter(logging.Formatter):
@@ -18,12 +30,57 @@ class WorkerFormatter(logging.Formatter):
         logging.CRITICAL: "🚨 %(asctime)s - %(name)s - %(message)s",
     }
     
+    def __init__(self):
+        super().__init__()
+        self._formatters = {
+            level: logging.Formatter(fmt, datefmt='%Y-%m-%d %H:%M:%S')
+            for level, fmt in self.FORMATS.items()
+        }
+    
     def format(self, record):
-        log_format = self.FORMATS.get(record.levelno, self.FORMATS[logging.INFO])
-        formatter = logging.Formatter(log_format, datefmt='%Y-%m-%d %H:%M:%S')
+        formatter = self._formatters.get(record.levelno, self._formatters[logging.INFO])
         return formatter.format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """Formatter that renders each record as a single JSON line."""
+    
+    def format(self, record):
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        
+        # Include structured fields passed via `extra`
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves exception info for the listener's formatter."""
+    
+    def prepare(self, record):
+        # The stock prepare() folds the traceback into msg and drops exc_info,
+        # which would keep JsonFormatter from emitting a separate 'exception'
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+def _build_formatter(json_format: bool) -> logging.Formatter:
+    return JsonFormatter() if json_format else WorkerFormatter()
+
+
 def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
     Get a configured logger instance.
@@ -31,7 +88,7 @@ def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     Args:
         name: Logger name (usually __name__)
         level: Logging level
-        
+    
     Returns:
         Configured logger instance
     """
@@ -41,18 +98,26 @@ def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
         handler = logging.StreamHandler(sys.stdout)
         handler.setFormatter(WorkerFormatter())
         logger.addHandler(handler)
-        
+    
     logger.setLevel(level)
     return logger
 
 
-def setup_logging(level: int = logging.INFO):
+def setup_logging(level: int = logging.INFO, json_format: bool = False,
+                  use_queue: bool = True):
     """
     Setup root logging configuration.
     
+    When use_queue is set, records are handed to a QueueHandler and written to
+    stdout by a background QueueListener, so probe loops never block on I/O.
+    
     Args:
         level: Logging level for root logger
+        json_format: Emit one JSON object per line instead of emoji text
+        use_queue: Write records from a background listener thread
     """
+    global _listener
+    
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     
@@ -60,7 +125,32 @@ def setup_logging(level: int = logging.INFO):
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    
     # Add custom handler
     handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(WorkerFormatter())
-    root_logger.addHandler(handler)
+    handler.setFormatter(_build_formatter(json_format))
+    
+    if not use_queue:
+        root_logger.addHandler(handler)
+        return
+    
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(_QueueHandler(log_queue))
+    
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush and stop the background log listener, if one is running."""
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
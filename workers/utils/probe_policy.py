@@ -0,0 +1,321 @@
+"""
+Per-host probe policy shared by the health, SSL and SEO workers.
+Provides adaptive timeouts from recent latency, bounded retries with
+jittered backoff for transient errors, and a circuit breaker that probes
+known-dead hosts cheaply and less often.
+"""
+import logging
+import random
+import socket
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    PROBE_MIN_TIMEOUT,
+    PROBE_TIMEOUT_MULTIPLIER,
+    PROBE_LATENCY_ALPHA,
+    PROBE_MAX_RETRIES,
+    PROBE_RETRY_BASE_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN,
+    CIRCUIT_MAX_COOLDOWN,
+)
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying (the server is alive but momentarily unhappy)
+TRANSIENT_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Global policy instance
+_policy = None
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host is known to be down and was not probed."""
+
+
+class HostUnreachableError(CircuitOpenError):
+    """Raised when an open circuit's TCP connect check failed during this run."""
+
+
+class HostState:
+    """Latency and failure tracking for a single host."""
+
+    __slots__ = ('latency_ewma', 'failures', 'open_until', 'tcp_failed')
+
+    def __init__(self):
+        self.latency_ewma = None
+        self.failures = 0
+        self.open_until = 0.0
+        # Set when this process saw the TCP check fail; never persisted
+        self.tcp_failed = False
+
+
+def host_key(url: str) -> str:
+    """Return the host[:port] key used to group probes for a URL."""
+    parsed = urlparse(url)
+    return (parsed.netloc or parsed.path).lower()
+
+
+class ProbePolicy:
+    """Tracks per-host latency and failures to shape probe behaviour."""
+
+    def __init__(self,
+                 min_timeout: float = PROBE_MIN_TIMEOUT,
+                 timeout_multiplier: float = PROBE_TIMEOUT_MULTIPLIER,
+                 latency_alpha: float = PROBE_LATENCY_ALPHA,
+                 max_retries: int = PROBE_MAX_RETRIES,
+                 retry_base_delay: float = PROBE_RETRY_BASE_DELAY,
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown: float = CIRCUIT_COOLDOWN,
+                 max_cooldown: float = CIRCUIT_MAX_COOLDOWN):
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.latency_alpha = latency_alpha
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._hosts = {}
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            # setdefault keeps concurrent probes of a new host on one state
+            state = self._hosts.setdefault(host, HostState())
+        return state
+
+    def seed_from_site(self, site: dict, url: str | None = None):
+        """
+        Seed host state from a website document written by a previous run.
+
+        Args:
+            site: Website document (uses 'probe' and 'responseTime' fields)
+            url: URL actually probed for the site (e.g. its cached redirect
+                target); defaults to the site's own URL
+        """
+        url = url or site.get('url')
+        if not url:
+            return
+
+        probe = site.get('probe') or {}
+        self.restore(host_key(url), {
+            'latencyEwma': probe.get('latencyEwma') or site.get('responseTime'),
+            'failures': probe.get('failures'),
+            'openUntil': probe.get('openUntil'),
+        })
+
+    def restore(self, host: str, data: dict):
+        """
+        Merge saved state for a host into the current state.
+
+        Args:
+            host: Host key as returned by host_key()
+            data: Dict with 'latencyEwma', 'failures' and 'openUntil'
+        """
+        state = self._state(host)
+
+        if state.latency_ewma is None and data.get('latencyEwma'):
+            state.latency_ewma = float(data['latencyEwma'])
+
+        state.failures = max(state.failures, int(data.get('failures') or 0))
+
+        open_until = data.get('openUntil')
+        if isinstance(open_until, datetime):
+            if open_until.tzinfo is None:
+                open_until = open_until.replace(tzinfo=timezone.utc)
+            state.open_until = max(state.open_until, open_until.timestamp())
+
+    def _export_state(self, state: HostState) -> dict:
+        return {
+            'latencyEwma': round(state.latency_ewma, 1) if state.latency_ewma is not None else None,
+            'failures': state.failures,
+            'openUntil': (datetime.fromtimestamp(state.open_until, timezone.utc)
+                          if state.open_until else None),
+        }
+
+    def export(self, url: str) -> dict:
+        """
+        Export host state for storage on the website document.
+
+        Args:
+            url: URL whose host state to export
+
+        Returns:
+            Dict suitable for the website 'probe' subdocument
+        """
+        return self._export_state(self._state(host_key(url)))
+
+    def snapshot(self) -> dict:
+        """Export the state of every host seen so far, keyed by host."""
+        return {
+            host: self._export_state(state)
+            for host, state in list(self._hosts.items())
+            if state.latency_ewma is not None or state.failures
+        }
+
+    def timeout_for(self, url: str, max_timeout: float, attempt: int = 0) -> float:
+        """
+        Compute the timeout for a probe from the host's recent latency.
+
+        Each retry doubles the timeout so a slow-but-alive host is not
+        reported offline just because it was slower than usual.
+
+        Args:
+            url: URL being probed
+            max_timeout: Configured upper bound for this kind of probe
+            attempt: Zero-based attempt number
+
+        Returns:
+            Timeout in seconds
+        """
+        state = self._state(host_key(url))
+        if state.latency_ewma is None:
+            return max_timeout
+
+        timeout = state.latency_ewma / 1000 * self.timeout_multiplier * (2 ** attempt)
+        return min(max_timeout, max(self.min_timeout, timeout))
+
+    def record_success(self, url: str, elapsed_ms: float | None = None):
+        """Record that the host responded, closing its circuit."""
+        state = self._state(host_key(url))
+        state.failures = 0
+        state.open_until = 0.0
+
+        if elapsed_ms is not None:
+            if state.latency_ewma is None:
+                state.latency_ewma = float(elapsed_ms)
+            else:
+                state.latency_ewma += self.latency_alpha * (elapsed_ms - state.latency_ewma)
+
+    def record_failure(self, url: str):
+        """Record that the host could not be reached, opening its circuit if needed."""
+        state = self._state(host_key(url))
+        state.failures += 1
+
+        if state.failures >= self.failure_threshold:
+            # Back off exponentially the longer the host stays dead
+            exponent = state.failures - self.failure_threshold
+            cooldown = min(self.max_cooldown, self.cooldown * (2 ** exponent))
+            state.open_until = time.time() + cooldown
+
+    def before_probe(self, url: str):
+        """
+        Gate a probe through the host's circuit breaker.
+
+        Closed circuits pass straight through. Once an open circuit's
+        cooldown elapses (cooldowns stay below the interval between scheduled
+        runs, so this happens at least once per run), a cheap TCP connect
+        decides whether the full probe is worth running. Within the cooldown
+        probes fail immediately: as unreachable if the TCP check failed in
+        this run, otherwise as skipped.
+
+        Args:
+            url: URL about to be probed
+
+        Raises:
+            HostUnreachableError: If the host refused TCP connections this run
+            CircuitOpenError: If the probe was skipped without contacting the host
+        """
+        state = self._state(host_key(url))
+        if state.failures < self.failure_threshold:
+            return
+
+        if time.time() < state.open_until:
+            if state.tcp_failed:
+                raise HostUnreachableError(
+                    f"Host unreachable ({state.failures} consecutive failures)")
+            raise CircuitOpenError(f"Probe skipped ({state.failures} consecutive failures)")
+
+        if not self._tcp_reachable(url):
+            self.record_failure(url)
+            state.tcp_failed = True
+            raise HostUnreachableError(f"Host unreachable ({state.failures} consecutive failures)")
+        state.tcp_failed = False
+
+    def _tcp_reachable(self, url: str) -> bool:
+        parsed = urlparse(url)
+        if not parsed.hostname:
+            return False
+
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        try:
+            with socket.create_connection((parsed.hostname, port), timeout=self.min_timeout):
+                return True
+        except OSError:
+            return False
+
+    def call(self, url: str, func, max_timeout: float, transient: tuple = (),
+             should_retry=None, timed=None):
+        """
+        Run a probe with adaptive timeouts and bounded, jittered retries.
+
+        All attempts together (including backoff) stay within max_timeout, so
+        a host that stops answering costs one probe timeout, not one per try.
+
+        Args:
+            url: URL being probed
+            func: Callable taking a timeout in seconds and returning a result
+            max_timeout: Configured upper bound for this kind of probe
+            transient: Exception types worth retrying
+            should_retry: Optional predicate on the result that requests a retry
+            timed: Optional predicate on the result; when it returns False the
+                attempt's duration is not a comparable latency sample (e.g. the
+                body was only partly read) and is neither recorded nor returned
+
+        Returns:
+            Tuple of (result, elapsed_ms) from the last attempt; elapsed_ms is
+            None for untimed results
+
+        Raises:
+            CircuitOpenError: If the host is known to be down
+            Exception: The last transient error once retries are exhausted
+        """
+        self.before_probe(url)
+        deadline = time.monotonic() + max_timeout
+
+        for attempt in range(self.max_retries + 1):
+            timeout = min(self.timeout_for(url, max_timeout, attempt),
+                          deadline - time.monotonic())
+            start = time.perf_counter()
+            try:
+                result = func(timeout)
+            except transient:
+                if attempt == self.max_retries or not self._can_retry(deadline):
+                    self.record_failure(url)
+                    raise
+            else:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if (attempt == self.max_retries or not self._can_retry(deadline)
+                        or not (should_retry and should_retry(result))):
+                    if timed and not timed(result):
+                        elapsed_ms = None
+                    self.record_success(url, elapsed_ms)
+                    return result, elapsed_ms
+
+            self._sleep_backoff(attempt, deadline)
+
+    def _can_retry(self, deadline: float) -> bool:
+        # Another attempt needs at least the minimum timeout left in the budget
+        return deadline - time.monotonic() >= self.min_timeout
+
+    def _sleep_backoff(self, attempt: int, deadline: float):
+        # Full jitter keeps retries from many probes from lining up
+        delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+        delay = max(0.0, min(delay, deadline - time.monotonic() - self.min_timeout))
+        logger.debug("Retrying probe in %.2fs", delay)
+        time.sleep(delay)
+
+
+def get_probe_policy() -> ProbePolicy:
+    """Get or create the shared probe policy."""
+    global _policy
+    if _policy is None:
+        _policy = ProbePolicy()
+    return _policy
@@ -0,0 +1,114 @@
+"""
+Redirect-chain resolution cache for probes.
+Remembers where monitored URLs permanently redirect to, so probes can go
+straight to the final target instead of paying a round-trip per hop.
+Entries are persisted on the website document and revalidated periodically.
+"""
+from datetime import datetime, timezone, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import REDIRECT_REVALIDATE_AFTER
+
+PERMANENT_REDIRECT_CODES = frozenset({301, 308})
+
+# Global cache instance
+_cache = None
+
+
+def _elapsed_ms(response) -> int | None:
+    try:
+        return int(response.elapsed.total_seconds() * 1000)
+    except (AttributeError, RuntimeError):
+        # httpx only sets elapsed once a response has been closed
+        return None
+
+
+class RedirectCache:
+    """Maps monitored URLs to their resolved redirect chains."""
+
+    def __init__(self, revalidate_after: int = REDIRECT_REVALIDATE_AFTER):
+        self.revalidate_after = timedelta(seconds=revalidate_after)
+        self._entries = {}
+
+    def seed_from_site(self, site: dict):
+        """Load a redirect entry stored on a website by a previous run."""
+        if site.get('url') and site.get('redirect'):
+            self.restore(site['url'], site['redirect'])
+
+    def restore(self, url: str, entry: dict):
+        """Load a redirect entry saved by a previous run, unless one is already known."""
+        if not entry.get('target'):
+            return
+        resolved_at = entry.get('resolvedAt')
+        if isinstance(resolved_at, datetime) and resolved_at.tzinfo is None:
+            entry = {**entry, 'resolvedAt': resolved_at.replace(tzinfo=timezone.utc)}
+        self._entries.setdefault(url, entry)
+
+    def resolve(self, url: str) -> str:
+        """
+        Return the URL to probe: the cached permanent target, or url itself.
+
+        Entries older than the revalidation interval are ignored so the full
+        chain is followed (and re-recorded) again.
+        """
+        entry = self._entries.get(url)
+        if not entry or not entry.get('permanent'):
+            return url
+
+        resolved_at = entry.get('resolvedAt')
+        if not resolved_at or datetime.now(timezone.utc) - resolved_at > self.revalidate_after:
+            return url
+        return entry['target']
+
+    def invalidate(self, url: str):
+        """Forget the cached target for a URL."""
+        self._entries.pop(url, None)
+
+    def record(self, url: str, response):
+        """
+        Record the redirect chain followed by a response to url.
+
+        Args:
+            url: The monitored URL that was requested
+            response: Final requests or httpx response (with .history)
+        """
+        if not response.history:
+            self._entries.pop(url, None)
+            return
+
+        chain = [
+            {'url': str(hop.url), 'status': hop.status_code, 'ms': _elapsed_ms(hop)}
+            for hop in response.history
+        ]
+        permanent = (
+            response.status_code == 200
+            and all(hop.status_code in PERMANENT_REDIRECT_CODES for hop in response.history)
+        )
+
+        self._entries[url] = {
+            'target': str(response.url),
+            'chain': chain,
+            'hops': len(chain),
+            'hopMs': sum(hop['ms'] or 0 for hop in chain),
+            'permanent': permanent,
+            'resolvedAt': datetime.now(timezone.utc),
+        }
+
+    def export(self, url: str) -> dict | None:
+        """Export the entry for storage on the website's 'redirect' field."""
+        return self._entries.get(url)
+
+    def snapshot(self) -> dict:
+        """Export all entries keyed by monitored URL."""
+        return dict(self._entries)
+
+
+def get_redirect_cache() -> RedirectCache:
+    """Get or create the shared redirect cache."""
+    global _cache
+    if _cache is None:
+        _cache = RedirectCache()
+    return _cache
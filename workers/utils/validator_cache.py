@@ -0,0 +1,109 @@
+"""
+HTTP validator (ETag / Last-Modified) cache for conditional fetches.
+Lets the SEO worker ask whether a page changed since it was last analyzed
+and skip downloading and parsing it when the server answers 304. Each entry
+can carry what the worker derived from the page, for reuse on a 304.
+"""
+from datetime import datetime, timezone, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import VALIDATOR_MAX_AGE
+
+# Global cache instance
+_cache = None
+
+
+class ValidatorCache:
+    """Maps fetched URLs to the validators of their last full response."""
+
+    def __init__(self, max_age: int = VALIDATOR_MAX_AGE):
+        self.max_age = timedelta(seconds=max_age)
+        self._entries = {}
+
+    def headers_for(self, url: str) -> dict:
+        """
+        Build conditional request headers for a URL.
+
+        Validators older than the maximum age are not sent, so every page
+        is fully re-analyzed at least that often.
+
+        Args:
+            url: URL about to be fetched
+
+        Returns:
+            Dict of If-None-Match / If-Modified-Since headers (may be empty)
+        """
+        entry = self._entries.get(url)
+        if not entry or datetime.now(timezone.utc) - entry['storedAt'] > self.max_age:
+            return {}
+        if entry.get('data') is None:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('lastModified'):
+            headers['If-Modified-Since'] = entry['lastModified']
+        return headers
+
+    def record(self, url: str, response, data: dict | None = None):
+        """
+        Remember the validators of a full 200 response.
+
+        Args:
+            url: URL that was fetched
+            response: requests or httpx response
+            data: What was derived from the body, returned by data_for() on a 304
+        """
+        if response.status_code != 200:
+            return
+
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if etag or last_modified:
+            self._entries[url] = {
+                'etag': etag,
+                'lastModified': last_modified,
+                'storedAt': datetime.now(timezone.utc),
+                'data': data,
+            }
+        else:
+            self._entries.pop(url, None)
+
+    def data_for(self, url: str) -> dict | None:
+        """Return the data recorded with a URL's validators, if any."""
+        entry = self._entries.get(url)
+        return entry.get('data') if entry else None
+
+    def invalidate(self, url: str):
+        """Forget the validators for a URL."""
+        self._entries.pop(url, None)
+
+    def snapshot(self) -> dict:
+        """Export all entries keyed by URL."""
+        return dict(self._entries)
+
+    def restore(self, url: str, data: dict):
+        """Load an entry saved by a previous run."""
+        stored_at = data.get('storedAt')
+        if url in self._entries or not isinstance(stored_at, datetime):
+            return
+        if stored_at.tzinfo is None:
+            stored_at = stored_at.replace(tzinfo=timezone.utc)
+        self._entries[url] = {
+            'etag': data.get('etag'),
+            'lastModified': data.get('lastModified'),
+            'storedAt': stored_at,
+            'data': data.get('data'),
+        }
+
+
+def get_validator_cache() -> ValidatorCache:
+    """Get or create the shared validator cache."""
+    global _cache
+    if _cache is None:
+        _cache = ValidatorCache()
+    return _cache
@@ -0,0 +1,111 @@
+"""
+Warm-start snapshot of the probe caches.
+Host latency/circuit state, redirect chains, DNS answers and HTTP
+validators are saved to MongoDB at the end of each run and loaded at
+startup, so workers on fresh CI runners do not start cold.
+"""
+import logging
+from datetime import datetime, timezone, timedelta
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_warm_cache_collection
+from config import WARM_CACHE_MAX_AGE
+from utils.dns_cache import get_dns_cache
+from utils.probe_policy import get_probe_policy
+from utils.redirect_cache import get_redirect_cache
+from utils.validator_cache import get_validator_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of any entry changes; older entries are ignored and pruned
+SNAPSHOT_VERSION = 2
+
+
+def _caches() -> dict:
+    """Map each snapshot entry kind to the shared cache that owns it."""
+    return {
+        'host': get_probe_policy(),
+        'redirect': get_redirect_cache(),
+        'dns': get_dns_cache(),
+        'validator': get_validator_cache(),
+    }
+
+
+class WarmCache:
+    """Loads and saves the shared probe caches in the warmcaches collection."""
+
+    def __init__(self, max_age: int = WARM_CACHE_MAX_AGE):
+        self.max_age = timedelta(seconds=max_age)
+        self._baseline = {}
+
+    def _collect(self) -> dict:
+        return {
+            f"{kind}:{key}": (kind, key, data)
+            for kind, cache in _caches().items()
+            for key, data in cache.snapshot().items()
+        }
+
+    def load(self) -> 'WarmCache':
+        """
+        Restore cache entries saved by previous runs and install the DNS cache.
+
+        Returns:
+            self, for chaining
+        """
+        caches = _caches()
+        cutoff = datetime.now(timezone.utc) - self.max_age
+        loaded = 0
+
+        try:
+            for doc in get_warm_cache_collection().find(
+                {'version': SNAPSHOT_VERSION, 'updatedAt': {'$gte': cutoff}}
+            ):
+                cache = caches.get(doc.get('kind'))
+                if cache is not None:
+                    cache.restore(doc['key'], doc.get('data') or {})
+                    loaded += 1
+        except PyMongoError as e:
+            logger.warning("Could not load warm cache snapshot: %s", e)
+
+        get_dns_cache().install()
+
+        # Only entries that differ from what was loaded are written back
+        self._baseline = {entry_id: data for entry_id, (_, _, data) in self._collect().items()}
+        logger.info("Warm cache loaded (%d entries)", loaded)
+        return self
+
+    def save(self):
+        """Persist new and changed entries, pruning stale ones."""
+        now = datetime.now(timezone.utc)
+        current = self._collect()
+        updates = [
+            UpdateOne(
+                {'_id': entry_id},
+                {'$set': {'kind': kind, 'key': key, 'version': SNAPSHOT_VERSION,
+                          'data': data, 'updatedAt': now}},
+                upsert=True
+            )
+            for entry_id, (kind, key, data) in current.items()
+            if self._baseline.get(entry_id) != data
+        ]
+
+        try:
+            collection = get_warm_cache_collection()
+            if updates:
+                collection.bulk_write(updates, ordered=False)
+            collection.delete_many({'$or': [
+                {'version': {'$ne': SNAPSHOT_VERSION}},
+                {'updatedAt': {'$lt': now - self.max_age}},
+            ]})
+        except PyMongoError as e:
+            logger.warning("Could not save warm cache snapshot: %s", e)
+            return
+
+        self._baseline = {entry_id: data for entry_id, (_, _, data) in current.items()}
+        logger.info("Warm cache saved (%d entries updated)", len(updates))
@@ -5,10 +5,12 @@ from .health_check import run_health_checks
 from .ssl_validator import run_ssl_checks
 from .seo_analyzer import run_seo_analysis
 from .cleanup import run_cleanup
+from .latency_baseline import run_latency_baselines
 
 __all__ = [
     'run_health_checks',
     'run_ssl_checks',
     'run_seo_analysis',
     'run_cleanup',
+    'run_latency_baselines',
 ]
@@ -30,7 +30,7 @@ def cleanup_expired_tokens():
     )
     
     if result.modified_count > 0:
-        logger.info(f"Marked {result.modified_count} tokens as expired")
+        logger.info("Marked %d tokens as expired", result.modified_count)
     
     return result.modified_count
 
@@ -70,7 +70,7 @@ def purge_old_expired_tokens():
         deleted_tokens += 1
     
     if deleted_tokens > 0 or deleted_websites > 0:
-        logger.info(f"Purged {deleted_tokens} old tokens and {deleted_websites} associated websites")
+        logger.info("Purged %d old tokens and %d associated websites", deleted_tokens, deleted_websites)
     
     return deleted_tokens
 
@@ -85,10 +85,10 @@ def run_cleanup():
         expired_count = cleanup_expired_tokens()
         purged_count = purge_old_expired_tokens()
         
-        logger.info(f"✅ Cleanup completed: {expired_count} marked expired, {purged_count} purged")
+        logger.info("✅ Cleanup completed: %d marked expired, %d purged", expired_count, purged_count)
         
     except Exception as e:
-        logger.error(f"❌ Cleanup failed: {e}")
+        logger.error("❌ Cleanup failed: %s", e)
         raise
 
 
@@ -2,9 +2,10 @@
 Health check worker for monitoring website uptime and response times.
 """
 import logging
+import re
 from datetime import datetime, timezone
-from time import perf_counter
 
+import httpx
 import requests
 
 import sys
@@ -12,102 +13,298 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db import get_websites_collection, get_users_collection
-from config import HEALTH_CHECK_TIMEOUT
-from utils.email_sender import send_alert_email
+from config import HEALTH_CHECK_TIMEOUT, CONTENT_CHUNK_SIZE, WORKER_RESUME_ONLY
+from utils.alert_digest import AlertDigest
+from utils.checkpoint import RunCheckpoint
+from utils.content_assertions import ContentAssertions, declared_charset
+from utils.fair_queue import FairScheduler, tenant_of
+from utils.http_client import (
+    get_http2_client,
+    close_http2_client,
+    multiplexed_origins,
+    origin_of,
+    protocol_of,
+)
+from utils.latency_sketch import sketch_update
+from utils.redirect_cache import get_redirect_cache
+from utils.probe_policy import (
+    get_probe_policy,
+    CircuitOpenError,
+    HostUnreachableError,
+    TRANSIENT_STATUS_CODES,
+)
+from utils.warm_cache import WarmCache
 
 logger = logging.getLogger(__name__)
 
 
-def check_uptime(url: str) -> tuple[bool, int | None]:
+def check_uptime(url: str, client: httpx.Client | None = None,
+                 assertions: ContentAssertions | None = None
+                 ) -> tuple[bool, int | None, str | None, dict | None]:
     """
     Check if a website is up and measure response time.
     
+    Timeouts adapt to the host's recent latency, transient errors are
+    retried with jittered backoff, and hosts known to be down are skipped
+    by the shared circuit breaker. When content assertions are given, the
+    body is streamed through them and a 200 with the wrong content counts
+    as down; if reading stopped early no response time is reported, since
+    it would not be comparable with full page loads. Cached permanent
+    redirects are probed at their final target.
+    
     Args:
         url: The URL to check
+        client: Optional shared HTTP/2 client; requests is used otherwise
+        assertions: Optional content assertions for the response body
         
     Returns:
-        Tuple of (is_up, response_time_ms)
+        Tuple of (is_up, response_time_ms, protocol, content_check), or None
+        if the probe was skipped without contacting the host
     """
+    policy = get_probe_policy()
+    redirects = get_redirect_cache()
+    target = redirects.resolve(url)
+    headers = {'User-Agent': 'WebMonitor Health Check/1.0'}
+    
+    def check_content(response, chunks):
+        if assertions is None or response.status_code != 200:
+            return None
+        # requests reports ISO-8859-1 for any undeclared text charset; use UTF-8 then
+        return assertions.evaluate(chunks, declared_charset(response))
+    
+    if client is not None:
+        def probe(timeout):
+            with client.stream('GET', target, timeout=timeout, headers=headers) as response:
+                content_check = check_content(response, response.iter_bytes(CONTENT_CHUNK_SIZE))
+                if assertions is None:
+                    # Read the whole body so timing matches a full page load
+                    response.read()
+            return response, content_check
+        transient = (httpx.TimeoutException, httpx.NetworkError)
+    else:
+        def probe(timeout):
+            with requests.get(target, timeout=timeout, headers=headers, stream=True) as response:
+                content_check = check_content(response, response.iter_content(CONTENT_CHUNK_SIZE))
+                if assertions is None:
+                    # Read the whole body so timing matches a full page load
+                    response.content
+            return response, content_check
+        transient = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+    
     try:
-        start = perf_counter()
-        response = requests.get(
-            url,
-            timeout=HEALTH_CHECK_TIMEOUT,
-            headers={'User-Agent': 'WebMonitor Health Check/1.0'}
+        (response, content_check), elapsed_ms = policy.call(
+            target,
+            probe,
+            max_timeout=HEALTH_CHECK_TIMEOUT,
+            transient=transient,
+            should_retry=lambda result: result[0].status_code in TRANSIENT_STATUS_CODES,
+            # Partial reads would drag the latency EWMA and sketch down
+            timed=lambda result: result[1] is None or result[1]['complete'],
         )
-        elapsed_ms = int((perf_counter() - start) * 1000)
-        return response.status_code == 200, elapsed_ms
-    except requests.exceptions.Timeout:
-        logger.warning(f"Timeout checking {url}")
-        return False, None
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"Error checking {url}: {e}")
-        return False, None
+        
+        if target != url:
+            if response.history or response.status_code in (404, 410):
+                # The cached target moved or vanished; follow the full chain again
+                redirects.invalidate(url)
+                return check_uptime(url, client, assertions)
+        else:
+            redirects.record(url, response)
+        
+        is_up = response.status_code == 200 and (content_check is None or content_check['passed'])
+        response_time = int(elapsed_ms) if elapsed_ms is not None else None
+        return is_up, response_time, protocol_of(response), content_check
+    except HostUnreachableError as e:
+        logger.warning("Error checking %s: %s", url, e, extra={'url': url})
+        return False, None, None, None
+    except CircuitOpenError as e:
+        logger.debug("Skipping %s: %s", url, e, extra={'url': url})
+        return None
+    except (requests.exceptions.Timeout, httpx.TimeoutException):
+        logger.warning("Timeout checking %s", url, extra={'url': url})
+        return False, None, None, None
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+        logger.warning("Error checking %s: %s", url, e, extra={'url': url})
+        return False, None, None, None
+
+
+def _site_assertions(site: dict) -> ContentAssertions | None:
+    try:
+        return ContentAssertions.from_site(site)
+    except re.error as e:
+        logger.warning("Ignoring invalid content regex for %s: %s", site['url'], e,
+                       extra={'url': site['url']})
+        return None
 
 
-def run_health_checks():
+def run_health_checks(resume_only: bool = WORKER_RESUME_ONLY):
     """
     Run health checks for all monitored websites.
-    Updates MongoDB with status and sends email alerts for downtime.
+    Updates MongoDB with status and sends per-user alert digests for
+    downtime and recovery.
+    
+    Args:
+        resume_only: Only continue a paused or interrupted run, if any
     """
     logger.info("🔄 Starting health checks...")
     
     websites = get_websites_collection()
     users = get_users_collection()
     
-    all_sites = list(websites.find({}))
+    # Resume an interrupted run from its per-tenant checkpoint cursors
+    checkpoint = RunCheckpoint('health_checks', resume_only=resume_only).start(
+        {'checked': 0, 'online': 0, 'offline': 0, 'skipped': 0}
+    )
+    if checkpoint is None:
+        return
+    
+    all_sites = checkpoint.pending(
+        [site for site in websites.find({}) if site.get('url')],
+        key=lambda site: tenant_of(site)[0],
+    )
     
     if not all_sites:
         logger.info("No websites to check")
+        checkpoint.complete()
         return
     
-    logger.info(f"Checking {len(all_sites)} websites...")
+    # Start from the caches saved by previous runs (DNS, hosts, redirects),
+    # then seed per-host latency and circuit state from the websites
+    warm_cache = WarmCache().load()
+    policy = get_probe_policy()
+    redirects = get_redirect_cache()
+    for site in all_sites:
+        # Stored probe state belongs to the host actually probed
+        redirects.seed_from_site(site)
+        policy.seed_from_site(site, redirects.resolve(site['url']))
+    
+    digest = AlertDigest()
+    user_cache = {}
     
-    checked = 0
-    online = 0
-    offline = 0
+    def get_user(user_id):
+        if user_id not in user_cache:
+            user_cache[user_id] = users.find_one({'_id': user_id})
+        return user_cache[user_id]
     
-    for site in all_sites:
-        url = site.get('url')
-        if not url:
-            continue
-            
-        is_up, response_time = check_uptime(url)
+    # Concurrent probes to origins with many monitored URLs share one
+    # multiplexed connection (grouped by where they resolve after redirects)
+    targets = {site['url']: redirects.resolve(site['url']) for site in all_sites}
+    multiplexed = {
+        url
+        for urls in multiplexed_origins(list(targets.values())).values()
+        for url in urls
+    }
+    client = get_http2_client() if multiplexed else None
+    
+    def connection_of(site):
+        target = targets[site['url']]
+        return origin_of(target) if target in multiplexed else None
+    
+    scheduler = FairScheduler(all_sites, group_of=connection_of)
+    logger.info("Checking %d websites across %d tenants...", len(all_sites), scheduler.tenant_count)
+    
+    def probe(site):
+        url = site['url']
+        use_client = client if targets[url] in multiplexed else None
+        return check_uptime(url, use_client, _site_assertions(site))
+    
+    def record(site, result, tenant, cursor):
+        url = site['url']
+        
+        # Skipped by an open circuit: the site was not contacted, so its status,
+        # last check time and alerts stay as they were
+        if result is None:
+            checkpoint.advance(tenant, cursor, skipped=1)
+            return
+        
+        is_up, response_time, protocol, content_check = result
         
         update_data = {
             'lastCheckedAt': datetime.now(timezone.utc),
             'status': 'online' if is_up else 'offline',
             'isActive': is_up,
+            'probe': policy.export(redirects.resolve(url)),
+            'redirect': redirects.export(url),
         }
         
+        if content_check is not None:
+            update_data['contentCheck'] = content_check
+        if protocol is not None:
+            update_data['protocol'] = protocol
+        
+        update = {'$set': update_data}
+        
+        # No sample when the probe failed or stopped reading the body early
         if response_time is not None:
             update_data['responseTime'] = response_time
+            
+            # Fold the sample into the site's latency sketch and EWMA
+            latency_update = sketch_update(site.get('latency'), response_time)
+            update['$inc'] = latency_update['$inc']
+            update_data.update(latency_update['$set'])
+        
+        # A down alert queued by an earlier run that was never delivered
+        alert_pending = bool(site.get('alertPending'))
+        content_failed = content_check is not None and not content_check['passed']
+        down_user = None
+        
+        if is_up:
+            if alert_pending:
+                update['$unset'] = {'alertPending': ''}
+        elif (site.get('isActive') or alert_pending) and site.get('userId'):
+            # Flag the alert in the same write as the status change, so it is
+            # re-queued by the next run if this one dies before the digest is sent
+            user = get_user(site['userId'])
+            if user and user.get('email'):
+                down_user = user
+                update_data['alertPending'] = True
         
         # Update the website document
         websites.update_one(
             {'_id': site['_id']},
-            {'$set': update_data}
+            update
         )
         
-        checked += 1
+        checkpoint.advance(tenant, cursor, checked=1, online=int(is_up), offline=int(not is_up))
         if is_up:
-            online += 1
-            logger.debug(f"✓ {url}: online ({response_time}ms)")
-        else:
-            offline += 1
-            logger.warning(f"✗ {url}: offline")
+            logger.debug("✓ %s: online (%sms)", url, response_time,
+                         extra={'url': url, 'status': 'online', 'responseTime': response_time})
             
-            # Send email alert if site went down and has a user
-            if site.get('isActive') and site.get('userId'):
-                user = users.find_one({'_id': site['userId']})
+            # Queue a recovery notice if site was previously down (and the
+            # user was actually told about it)
+            if site.get('status') == 'offline' and not alert_pending and site.get('userId'):
+                user = get_user(site['userId'])
                 if user and user.get('email'):
-                    send_alert_email(
-                        to_email=user['email'],
-                        user_name=user.get('name', 'User'),
-                        website_url=url
-                    )
+                    digest.add_recovered(user, url)
+        elif content_failed:
+            logger.warning("✗ %s: content check failed - %s", url,
+                           "; ".join(content_check['failures']),
+                           extra={'url': url, 'status': 'offline'})
+        else:
+            logger.warning("✗ %s: offline", url, extra={'url': url, 'status': 'offline'})
+        
+        if down_user:
+            digest.add_down(down_user, url, site['_id'])
+        
+        digest.maybe_flush()
+    
+    try:
+        finished = scheduler.run(probe, record, should_stop=checkpoint.time_exhausted)
+    finally:
+        # Deliver whatever was queued even if the run is failing
+        digest.flush()
+    
+    close_http2_client()
+    warm_cache.save()
+    
+    if not finished:
+        checkpoint.pause()
+        return
     
-    logger.info(f"✅ Health checks completed: {checked} checked, {online} online, {offline} offline")
+    checkpoint.complete()
+    counters = checkpoint.counters
+    logger.info("✅ Health checks completed: %d checked, %d online, %d offline, %d skipped",
+                counters['checked'], counters['online'], counters['offline'],
+                counters.get('skipped', 0))
 
 
 if __name__ == '__main__':
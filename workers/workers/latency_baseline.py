@@ -0,0 +1,153 @@
+"""
+Latency baseline worker.
+Recomputes per-site latency quantiles from the stored sketches across the
+whole fleet at once and flags sites whose recent latency has regressed.
+"""
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+from pymongo import UpdateOne
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_websites_collection
+from config import (
+    LATENCY_SKETCH_DECAY,
+    LATENCY_MIN_SAMPLES,
+    LATENCY_REGRESSION_FACTOR,
+    LATENCY_REGRESSION_MIN_DELTA,
+)
+from utils.latency_sketch import bucket_value
+
+logger = logging.getLogger(__name__)
+
+
+def compute_baselines(sketches: list[dict], ewmas: list[float | None]) -> dict:
+    """
+    Compute quantiles, regression flags and decayed sketches for many sites.
+
+    Sketches are laid out as one (sites x buckets) count matrix so every
+    site is processed with the same handful of vectorized operations.
+
+    Args:
+        sketches: Per-site mappings of bucket index (as string) to count
+        ewmas: Per-site recent latency EWMA in milliseconds (or None)
+
+    Returns:
+        Dict of arrays/lists keyed by 'p50', 'p95', 'p99', 'samples',
+        'regression' and 'sketches' (decayed, aligned with the input)
+    """
+    indices = sorted({int(key) for sketch in sketches for key in sketch})
+    column = {index: j for j, index in enumerate(indices)}
+
+    counts = np.zeros((len(sketches), len(indices)))
+    for i, sketch in enumerate(sketches):
+        for key, count in sketch.items():
+            counts[i, column[int(key)]] = count
+
+    values = bucket_value(np.array(indices, dtype=float))
+    samples = counts.sum(axis=1)
+    cdf = np.cumsum(counts, axis=1)
+
+    def quantile(q):
+        # First bucket whose cumulative count reaches the quantile rank
+        return values[np.argmax(cdf >= (q * samples)[:, None], axis=1)]
+
+    p50 = quantile(0.50)
+    p95 = quantile(0.95)
+    p99 = quantile(0.99)
+
+    ewma = np.array([np.nan if value is None else value for value in ewmas], dtype=float)
+    with np.errstate(invalid='ignore'):
+        regression = (
+            (samples >= LATENCY_MIN_SAMPLES)
+            & (ewma > p50 * LATENCY_REGRESSION_FACTOR)
+            & (ewma - p50 > LATENCY_REGRESSION_MIN_DELTA)
+        )
+
+    # Decay old samples so the baseline follows long-term drift; drop dust
+    decayed = counts * LATENCY_SKETCH_DECAY
+    decayed[decayed < 0.01] = 0
+    decayed_sketches = [
+        {str(indices[j]): round(float(row[j]), 3) for j in np.flatnonzero(row)}
+        for row in decayed
+    ]
+
+    return {
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'samples': decayed.sum(axis=1),
+        'regression': regression,
+        'sketches': decayed_sketches,
+    }
+
+
+def run_latency_baselines():
+    """
+    Recompute latency baselines for all websites with recorded samples.
+    Updates MongoDB with quantiles and regression flags.
+    """
+    logger.info("📈 Starting latency baseline recompute...")
+
+    websites = get_websites_collection()
+
+    all_sites = [
+        site for site in websites.find(
+            {'latency.sketch': {'$exists': True}},
+            {'url': 1, 'latency': 1},
+        )
+        if site['latency'].get('sketch')
+    ]
+
+    if not all_sites:
+        logger.info("No latency samples to process")
+        return
+
+    logger.info("Recomputing baselines for %d websites...", len(all_sites))
+
+    result = compute_baselines(
+        [site['latency']['sketch'] for site in all_sites],
+        [site['latency'].get('ewma') for site in all_sites],
+    )
+
+    now = datetime.now(timezone.utc)
+    operations = []
+    regressions = 0
+
+    for i, site in enumerate(all_sites):
+        is_regression = bool(result['regression'][i])
+        operations.append(UpdateOne(
+            {'_id': site['_id']},
+            {'$set': {
+                'latency.sketch': result['sketches'][i],
+                'latency.count': round(float(result['samples'][i]), 3),
+                'latency.p50': round(float(result['p50'][i]), 1),
+                'latency.p95': round(float(result['p95'][i]), 1),
+                'latency.p99': round(float(result['p99'][i]), 1),
+                'latency.regression': is_regression,
+                'latency.baselineUpdatedAt': now,
+            }}
+        ))
+
+        if is_regression:
+            regressions += 1
+            logger.warning(
+                "🐢 %s: latency regression (recent %.0fms vs p50 %.0fms)",
+                site['url'], site['latency']['ewma'], result['p50'][i],
+                extra={'url': site['url']},
+            )
+
+    websites.bulk_write(operations, ordered=False)
+
+    logger.info("✅ Latency baselines completed: %d processed, %d regressions",
+                len(all_sites), regressions)
+
+
+if __name__ == '__main__':
+    # Allow running directly for testing
+    logging.basicConfig(level=logging.INFO)
+    run_latency_baselines()
@@ -6,6 +6,7 @@ Uses BeautifulSoup for lightweight HTML parsing (no browser overhead).
 
 import logging
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
 
@@ -15,29 +16,120 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db import get_websites_collection
-from config import SEO_ANALYSIS_TIMEOUT
+from config import (
+    SEO_ANALYSIS_TIMEOUT,
+    PAGE_WEIGHT_BUDGET,
+    ASSET_SLOW_MS,
+    WORKER_RESUME_ONLY,
+)
+from utils.asset_audit import AssetAuditor, collect_assets
+from utils.http_client import (
+    get_http2_client,
+    close_http2_client,
+    multiplexed_origins,
+    origin_of,
+)
+from utils.checkpoint import RunCheckpoint
+from utils.fair_queue import FairScheduler, tenant_of
+from utils.redirect_cache import get_redirect_cache
+from utils.probe_policy import (
+    get_probe_policy,
+    CircuitOpenError,
+    HostUnreachableError,
+    TRANSIENT_STATUS_CODES,
+)
+from utils.validator_cache import get_validator_cache
+from utils.warm_cache import WarmCache
 
 logger = logging.getLogger(__name__)
 
 
-def analyze_seo(url: str) -> dict:
+def _asset_issues(assets: dict) -> list[str]:
+    """Build the SEO issues raised by an asset audit."""
+    issues = []
+
+    if assets["totalBytes"] > PAGE_WEIGHT_BUDGET:
+        issues.append(
+            f"Page weight too high ({assets['totalBytes'] / 1024 / 1024:.1f} MB)"
+        )
+
+    if assets["brokenCount"]:
+        issues.append(f"{assets['brokenCount']} broken resources")
+
+    if assets["slowCount"]:
+        issues.append(f"{assets['slowCount']} slow resources (>{ASSET_SLOW_MS}ms)")
+
+    return issues
+
+
+def analyze_seo(
+    url: str,
+    client: httpx.Client | None = None,
+    auditor: AssetAuditor | None = None,
+    previous: dict | None = None,
+) -> dict:
     """
-    Analyze SEO metadata for a URL.
+    Analyze SEO metadata and page weight for a URL.
 
     Args:
         url: The URL to analyze
+        client: Optional shared HTTP/2 client; requests is used otherwise
+        auditor: Run-wide asset auditor; a fresh one is used if omitted
+        previous: Last stored SEO result; its page fields are reused (and only
+            the assets re-audited) if the page is unchanged
 
     Returns:
-        Dict with SEO metadata and issues
+        Dict with SEO metadata and issues, or None if the fetch was skipped
+        by an open circuit without contacting the host
     """
+    # Skip hops of permanent redirects already resolved by the health checks
+    target = get_redirect_cache().resolve(url)
+    validators = get_validator_cache()
+    headers = {"User-Agent": "Mozilla/5.0 (compatible; WebMonitor SEO Analyzer/1.0)"}
+
+    # Ask whether the page changed since the last successful analysis
+    if previous and not previous.get("error"):
+        headers.update(validators.headers_for(target))
+
+    if client is not None:
+
+        def fetch(timeout):
+            return client.get(target, timeout=timeout, headers=headers)
+
+        transient = (httpx.TimeoutException, httpx.NetworkError)
+    else:
+
+        def fetch(timeout):
+            return requests.get(target, timeout=timeout, headers=headers)
+
+        transient = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+
+    if auditor is None:
+        auditor = AssetAuditor(get_http2_client())
+
     try:
-        response = requests.get(
-            url,
-            timeout=SEO_ANALYSIS_TIMEOUT,
-            headers={
-                "User-Agent": "Mozilla/5.0 (compatible; WebMonitor SEO Analyzer/1.0)"
-            },
+        response, _ = get_probe_policy().call(
+            target,
+            fetch,
+            max_timeout=SEO_ANALYSIS_TIMEOUT,
+            transient=transient,
+            should_retry=lambda r: r.status_code in TRANSIENT_STATUS_CODES,
         )
+        if response.status_code == 304:
+            # The HTML is unchanged, but its assets can still break or slow down
+            page = validators.data_for(target)
+            assets = auditor.audit_assets(
+                page["assets"], page["pageBytes"], page["assetCount"]
+            )
+            issues = page["issues"] + _asset_issues(assets)
+            return {
+                **previous,
+                "pageWeight": assets["totalBytes"],
+                "assets": assets,
+                "issues": issues,
+                "hasIssues": len(issues) > 0,
+            }
+
         response.raise_for_status()
 
         soup = BeautifulSoup(response.text, "html.parser")
@@ -83,6 +175,25 @@ def analyze_seo(url: str) -> dict:
         if images_without_alt:
             issues.append(f"{len(images_without_alt)} images missing alt text")
 
+        # Audit referenced images, scripts and stylesheets
+        page_assets = collect_assets(soup, str(response.url))
+        page_bytes = len(response.content)
+
+        # Keep what a 304 next time needs to re-audit the assets without the HTML
+        validators.record(
+            target,
+            response,
+            {
+                "assets": [list(asset) for asset in page_assets[: auditor.max_assets]],
+                "assetCount": len(page_assets),
+                "pageBytes": page_bytes,
+                "issues": list(issues),
+            },
+        )
+
+        assets = auditor.audit_assets(page_assets, page_bytes)
+        issues += _asset_issues(assets)
+
         return {
             "title": title,
             "titleLength": len(title),
@@ -92,64 +203,142 @@ def analyze_seo(url: str) -> dict:
             "h2Count": len(h2_tags),
             "imageCount": len(images),
             "imagesWithoutAlt": len(images_without_alt),
+            "pageWeight": assets["totalBytes"],
+            "assets": assets,
             "issues": issues,
             "hasIssues": len(issues) > 0,
             "error": None,
         }
 
-    except requests.exceptions.Timeout:
+    except HostUnreachableError as e:
+        return {"error": str(e)}
+    except CircuitOpenError:
+        # Skipped without contacting the host; keep the stored SEO info
+        return None
+    except (requests.exceptions.Timeout, httpx.TimeoutException):
         return {"error": "Request timeout"}
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
         return {"error": f"Request error: {str(e)}"}
     except Exception as e:
         return {"error": str(e)}
 
 
-def run_seo_analysis():
+def run_seo_analysis(resume_only: bool = WORKER_RESUME_ONLY):
     """
     Run SEO analysis for all monitored websites.
     Updates MongoDB with SEO metadata.
+
+    Args:
+        resume_only: Only continue a paused or interrupted run, if any
     """
     logger.info("🔍 Starting SEO analysis...")
 
     websites = get_websites_collection()
 
-    # Only analyze active/online websites
-    all_sites = list(websites.find({"status": "online"}))
+    checkpoint = RunCheckpoint("seo_analysis", resume_only=resume_only).start(
+        {"checked": 0, "withIssues": 0, "errors": 0, "skipped": 0}
+    )
+    if checkpoint is None:
+        return
+
+    # Only analyze active/online websites, resuming from per-tenant cursors
+    all_sites = checkpoint.pending(
+        [site for site in websites.find({"status": "online"}) if site.get("url")],
+        key=lambda site: tenant_of(site)[0],
+    )
 
     if not all_sites:
         logger.info("No online websites to analyze")
+        checkpoint.complete()
         return
 
-    logger.info(f"Analyzing SEO for {len(all_sites)} websites...")
+    # Reuse DNS answers, host latency, circuit state and redirects recorded by
+    # the health checks, and page validators from the previous analysis
+    warm_cache = WarmCache().load()
+    policy = get_probe_policy()
+    redirects = get_redirect_cache()
+    for site in all_sites:
+        # Stored probe state belongs to the host actually probed
+        redirects.seed_from_site(site)
+        policy.seed_from_site(site, redirects.resolve(site["url"]))
+
+    # Concurrent fetches from origins with many monitored URLs share one
+    # multiplexed connection (grouped by where they resolve after redirects)
+    targets = {site["url"]: redirects.resolve(site["url"]) for site in all_sites}
+    multiplexed = {
+        url
+        for urls in multiplexed_origins(list(targets.values())).values()
+        for url in urls
+    }
+    client = get_http2_client()
+
+    def connection_of(site):
+        target = targets[site["url"]]
+        return origin_of(target) if target in multiplexed else None
+
+    scheduler = FairScheduler(all_sites, group_of=connection_of)
+    logger.info(
+        "Analyzing SEO for %d websites across %d tenants...",
+        len(all_sites),
+        scheduler.tenant_count,
+    )
 
-    checked = 0
-    with_issues = 0
-    errors = 0
+    # Assets shared between pages (CDN scripts, logos) are only checked once
+    auditor = AssetAuditor(client)
 
-    for site in all_sites:
-        url = site.get("url")
-        if not url:
-            continue
+    def fetch(site):
+        url = site["url"]
+        use_client = client if targets[url] in multiplexed else None
+        return analyze_seo(url, use_client, auditor, site.get("seo"))
+
+    def record(site, seo_info, tenant, cursor):
+        url = site["url"]
 
-        seo_info = analyze_seo(url)
+        if seo_info is None:
+            checkpoint.advance(tenant, cursor, skipped=1)
+            return
 
         # Update the website document with SEO info
         websites.update_one({"_id": site["_id"]}, {"$set": {"seo": seo_info}})
 
-        checked += 1
-        if seo_info.get("error"):
-            errors += 1
-            logger.warning(f"✗ {url}: SEO analysis failed - {seo_info['error']}")
-        elif seo_info.get("hasIssues"):
-            with_issues += 1
+        has_error = bool(seo_info.get("error"))
+        has_issues = not has_error and bool(seo_info.get("hasIssues"))
+
+        checkpoint.advance(
+            tenant,
+            cursor,
+            checked=1,
+            withIssues=int(has_issues),
+            errors=int(has_error),
+        )
+        if has_error:
+            logger.warning(
+                "✗ %s: SEO analysis failed - %s", url, seo_info["error"], extra={"url": url}
+            )
+        elif has_issues:
             issue_count = len(seo_info.get("issues", []))
-            logger.info(f"⚠ {url}: {issue_count} SEO issues found")
+            logger.info(
+                "⚠ %s: %d SEO issues found", url, issue_count, extra={"url": url}
+            )
         else:
-            logger.debug(f"✓ {url}: No SEO issues")
+            logger.debug("✓ %s: No SEO issues", url, extra={"url": url})
+
+    finished = scheduler.run(fetch, record, should_stop=checkpoint.time_exhausted)
+
+    close_http2_client()
+    warm_cache.save()
+
+    if not finished:
+        checkpoint.pause()
+        return
 
+    checkpoint.complete()
+    counters = checkpoint.counters
     logger.info(
-        f"✅ SEO analysis completed: {checked} analyzed, {with_issues} with issues, {errors} errors"
+        "✅ SEO analysis completed: %d analyzed, %d with issues, %d errors",
+        counters["checked"],
+        counters["withIssues"],
+        counters["errors"],
     )
 
 
@@ -13,7 +13,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db import get_websites_collection
-from config import SSL_CHECK_TIMEOUT
+from config import SSL_CHECK_TIMEOUT, WORKER_RESUME_ONLY
+from utils.checkpoint import RunCheckpoint
+from utils.fair_queue import FairScheduler, tenant_of
+from utils.probe_policy import get_probe_policy, CircuitOpenError, HostUnreachableError
+from utils.redirect_cache import get_redirect_cache
+from utils.warm_cache import WarmCache
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +31,8 @@ def check_ssl(url: str) -> dict:
         url: The URL to check SSL for
         
     Returns:
-        Dict with SSL certificate information
+        Dict with SSL certificate information, or None if the check was
+        skipped by an open circuit without contacting the host
     """
     try:
         parsed = urlparse(url)
@@ -42,9 +48,17 @@ def check_ssl(url: str) -> dict:
         
         context = ssl.create_default_context()
         
-        with socket.create_connection((hostname, port), timeout=SSL_CHECK_TIMEOUT) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert = ssock.getpeercert()
+        def fetch_cert(timeout):
+            with socket.create_connection((hostname, port), timeout=timeout) as sock:
+                with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+                    return ssock.getpeercert()
+        
+        cert, _ = get_probe_policy().call(
+            url,
+            fetch_cert,
+            max_timeout=SSL_CHECK_TIMEOUT,
+            transient=(socket.timeout, socket.gaierror, ConnectionError),
+        )
         
         if not cert:
             return {'isValid': False, 'error': 'No certificate found'}
@@ -78,6 +92,11 @@ def check_ssl(url: str) -> dict:
             'error': None
         }
         
+    except HostUnreachableError as e:
+        return {'isValid': False, 'error': str(e)}
+    except CircuitOpenError:
+        # Skipped without contacting the host; keep the stored SSL info
+        return None
     except socket.timeout:
         return {'isValid': False, 'error': 'Connection timeout'}
     except ssl.SSLError as e:
@@ -88,35 +107,55 @@ def check_ssl(url: str) -> dict:
         return {'isValid': False, 'error': str(e)}
 
 
-def run_ssl_checks():
+def run_ssl_checks(resume_only: bool = WORKER_RESUME_ONLY):
     """
     Run SSL certificate checks for all monitored websites.
     Updates MongoDB with SSL information.
+    
+    Args:
+        resume_only: Only continue a paused or interrupted run, if any
     """
     logger.info("🔒 Starting SSL certificate checks...")
     
     websites = get_websites_collection()
     
     # Only check HTTPS websites
-    all_sites = list(websites.find({'url': {'$regex': '^https://'}}))
+    checkpoint = RunCheckpoint('ssl_checks', resume_only=resume_only).start(
+        {'checked': 0, 'valid': 0, 'invalid': 0, 'expiringSoon': 0, 'skipped': 0}
+    )
+    if checkpoint is None:
+        return
+    
+    # Only check HTTPS websites, resuming from per-tenant cursors
+    all_sites = checkpoint.pending(
+        list(websites.find({'url': {'$regex': '^https://'}})),
+        key=lambda site: tenant_of(site)[0],
+    )
     
     if not all_sites:
         logger.info("No HTTPS websites to check")
+        checkpoint.complete()
         return
     
-    logger.info(f"Checking SSL for {len(all_sites)} websites...")
-    
-    checked = 0
-    valid = 0
-    invalid = 0
-    expiring_soon = 0
+    scheduler = FairScheduler(all_sites)
+    logger.info("Checking SSL for %d websites across %d tenants...",
+                len(all_sites), scheduler.tenant_count)
     
+    # Reuse DNS answers, host latency and circuit state recorded by the health checks
+    warm_cache = WarmCache().load()
+    policy = get_probe_policy()
+    redirects = get_redirect_cache()
     for site in all_sites:
-        url = site.get('url')
-        if not url:
-            continue
-            
-        ssl_info = check_ssl(url)
+        # Stored probe state belongs to the host the health check probed
+        redirects.seed_from_site(site)
+        policy.seed_from_site(site, redirects.resolve(site['url']))
+    
+    def record(site, ssl_info, tenant, cursor):
+        url = site['url']
+        
+        if ssl_info is None:
+            checkpoint.advance(tenant, cursor, skipped=1)
+            return
         
         # Update the website document with SSL info
         websites.update_one(
@@ -124,20 +163,37 @@ def run_ssl_checks():
             {'$set': {'ssl': ssl_info}}
         )
         
-        checked += 1
-        if ssl_info.get('isValid'):
-            valid += 1
-            days = ssl_info.get('daysRemaining', 0)
-            if days <= 30:
-                expiring_soon += 1
-                logger.warning(f"⚠ {url}: SSL expires in {days} days")
+        is_valid = bool(ssl_info.get('isValid'))
+        days = ssl_info.get('daysRemaining', 0)
+        is_expiring = is_valid and days <= 30
+        
+        checkpoint.advance(tenant, cursor, checked=1, valid=int(is_valid),
+                           invalid=int(not is_valid), expiringSoon=int(is_expiring))
+        if is_valid:
+            if is_expiring:
+                logger.warning("⚠ %s: SSL expires in %s days", url, days,
+                               extra={'url': url, 'daysRemaining': days})
             else:
-                logger.debug(f"✓ {url}: SSL valid ({days} days remaining)")
+                logger.debug("✓ %s: SSL valid (%s days remaining)", url, days,
+                             extra={'url': url, 'daysRemaining': days})
         else:
-            invalid += 1
-            logger.warning(f"✗ {url}: SSL invalid - {ssl_info.get('error', 'Unknown error')}")
+            logger.warning("✗ %s: SSL invalid - %s", url, ssl_info.get('error', 'Unknown error'),
+                           extra={'url': url})
+    
+    finished = scheduler.run(lambda site: check_ssl(site['url']), record,
+                             should_stop=checkpoint.time_exhausted)
+    
+    warm_cache.save()
+    
+    if not finished:
+        checkpoint.pause()
+        return
     
-    logger.info(f"✅ SSL checks completed: {checked} checked, {valid} valid, {invalid} invalid, {expiring_soon} expiring soon")
+    checkpoint.complete()
+    counters = checkpoint.counters
+    logger.info("✅ SSL checks completed: %d checked, %d valid, %d invalid, %d expiring soon",
+                counters['checked'], counters['valid'], counters['invalid'],
+                counters['expiringSoon'])
 
 
 if __name__ == '__main__':